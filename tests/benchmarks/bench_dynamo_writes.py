@@ -0,0 +1,261 @@
+"""Write throughput benchmark for the DynamoDB seeding paths.
+
+Drives DynamoDBHelper.insert_items, insert_into_dynamo and
+_insert_scenarios_into_dynamo against a local DynamoDB stand-in (e.g.
+``docker run -p 8000:8000 amazon/dynamodb-local``) at DYNAMODB_ENDPOINT_URL,
+over PERSON-shaped and COHORTS-shaped items at several item counts. Each
+case runs in a fresh process so its peak RSS can be reported. Run from the
+repository root:
+
+    DYNAMODB_ENDPOINT_URL=http://localhost:8000 \\
+        poetry run python -m tests.benchmarks.bench_dynamo_writes
+
+Results are written as JSON; pass ``--compare`` with an earlier results file
+to print the change in throughput per case.
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+DEFAULT_ENDPOINT_URL = "http://localhost:8000"
+LOCAL_HOSTS = frozenset(["localhost", "127.0.0.1", "::1"])
+DEFAULT_OUTPUT = "data/dynamoDB/temp/benchmarks/dynamo_writes.json"
+SCALES = [1_000, 10_000, 100_000]
+SHAPES = ["PERSON", "COHORTS"]
+TARGETS = ["insert_items", "insert_into_dynamo", "_insert_scenarios_into_dynamo"]
+COHORT_MEMBERSHIPS_PER_ITEM = 50
+ITEMS_PER_SCENARIO = 10
+BENCH_SECRET_KEYS = {"AWSCURRENT": b"bench-current", "AWSPREVIOUS": None}
+
+
+def _make_item(index: int, shape: str) -> dict:
+    nhs_number = str(9_000_000_000 + index)
+    if shape == "PERSON":
+        return {
+            "NHS_NUMBER": nhs_number,
+            "ATTRIBUTE_TYPE": "PERSON",
+            "DATE_OF_BIRTH": "19500101",
+            "POSTCODE": "LS1 1AB",
+            "POSTCODE_SECTOR": "LS1 1",
+            "POSTCODE_OUTCODE": "LS1",
+            "GP_PRACTICE": "Y12345",
+            "PCN": "U12345",
+            "ICB": "QWO",
+            "COMMISSIONING_REGION": "Y63",
+            "13Q_FLAG": "N",
+            "CARE_HOME_FLAG": "N",
+            "DE_FLAG": "N",
+        }
+    return {
+        "NHS_NUMBER": nhs_number,
+        "ATTRIBUTE_TYPE": "COHORTS",
+        "COHORT_MEMBERSHIPS": [
+            {"COHORT_LABEL": f"cohort_{cohort}", "DATE_JOINED": "20240101"}
+            for cohort in range(COHORT_MEMBERSHIPS_PER_ITEM)
+        ],
+    }
+
+
+class _TimedClient:
+    """Wraps a DynamoDB client, timing each BatchWriteItem call."""
+
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.Lock()
+        self.batch_seconds: list[float] = []
+
+    def batch_write_item(self, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._client.batch_write_item(**kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.batch_seconds.append(elapsed)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def _run_case(target: str, shape: str, count: int) -> dict:
+    """Run one case; executed in a child process."""
+    from utils import aws_clients, data_helper, dynamo_helper
+
+    # Clients inherited from the parent share its connections; start afresh
+    aws_clients.reset_clients()
+    items = [_make_item(index, shape) for index in range(count)]
+    bulk_writer = dynamo_helper.get_dynamo_helper().bulk_writer
+    timed_client = _TimedClient(bulk_writer.client)
+    bulk_writer.client = timed_client
+
+    start = time.perf_counter()
+    if target == "insert_items":
+        dynamo_helper.get_dynamo_helper().insert_items(items)
+    elif target == "insert_into_dynamo":
+        dynamo_helper.insert_into_dynamo(items)
+    else:
+        scenarios = (
+            {
+                "dynamo_items": items[i : i + ITEMS_PER_SCENARIO],
+                "secret_version": None,
+            }
+            for i in range(0, count, ITEMS_PER_SCENARIO)
+        )
+        with patch.object(
+            data_helper, "_initialise_hashing_secrets", return_value=BENCH_SECRET_KEYS
+        ):
+            data_helper._insert_scenarios_into_dynamo(scenarios)
+    seconds = time.perf_counter() - start
+
+    batch_seconds = timed_client.batch_seconds
+    p95 = (
+        statistics.quantiles(batch_seconds, n=20)[-1]
+        if len(batch_seconds) > 1
+        else sum(batch_seconds)
+    )
+    return {
+        "target": target,
+        "shape": shape,
+        "items": count,
+        "seconds": round(seconds, 3),
+        "items_per_second": round(count / seconds, 1),
+        "batches": len(batch_seconds),
+        "p95_batch_ms": round(p95 * 1000, 2),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def _create_table(table_name: str) -> None:
+    from utils.dynamo_helper import DynamoDBHelper
+
+    table = DynamoDBHelper(table_name, "bench")
+    table.key_schema = [
+        {"AttributeName": "NHS_NUMBER", "KeyType": "HASH"},
+        {"AttributeName": "ATTRIBUTE_TYPE", "KeyType": "RANGE"},
+    ]
+    table.attribute_definitions = [
+        {"AttributeName": "NHS_NUMBER", "AttributeType": "S"},
+        {"AttributeName": "ATTRIBUTE_TYPE", "AttributeType": "S"},
+    ]
+    table.create_table()
+
+
+def _delete_table(table_name: str) -> None:
+    from utils.dynamo_helper import DynamoDBHelper
+
+    DynamoDBHelper(table_name, "bench").delete_table(table_name)
+
+
+def _case_key(result: dict) -> tuple:
+    return result["target"], result["shape"], result["items"]
+
+
+def _print_comparison(results: list[dict], previous: dict, previous_path) -> None:
+    previous = {_case_key(result): result for result in previous["results"]}
+    print(f"\nChange in items/s against {previous_path}:")
+    for result in results:
+        before = previous.get(_case_key(result))
+        if before is None:
+            continue
+        change = result["items_per_second"] / before["items_per_second"] - 1
+        print(
+            f"{result['target']:<30} {result['shape']:<8} {result['items']:>7} "
+            f"{before['items_per_second']:>10.1f} -> {result['items_per_second']:>10.1f} "
+            f"({change:+.1%})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES)
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=SHAPES)
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=TARGETS)
+    parser.add_argument("--output", type=Path, default=Path(DEFAULT_OUTPUT))
+    parser.add_argument("--compare", type=Path)
+    parser.add_argument(
+        "--stand-in-host",
+        action="append",
+        default=[],
+        help="Also accept a DYNAMODB_ENDPOINT_URL on this host, e.g. a "
+        "dynamodb-local container; localhost is always accepted",
+    )
+    args = parser.parse_args()
+
+    # Tables are created, filled and deleted, so only ever run against a
+    # stand-in: an empty endpoint would send every call to real AWS
+    endpoint_url = os.getenv("DYNAMODB_ENDPOINT_URL") or DEFAULT_ENDPOINT_URL
+    host = urlparse(endpoint_url).hostname
+    if host not in LOCAL_HOSTS | set(args.stand_in_host):
+        parser.error(
+            f"DYNAMODB_ENDPOINT_URL {endpoint_url} is not a local stand-in; "
+            "pass --stand-in-host to allow its host"
+        )
+    # Read before running, in case --compare and --output are the same file
+    previous = (
+        json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    )
+
+    # Dummy credentials the stand-in accepts
+    os.environ["DYNAMODB_ENDPOINT_URL"] = endpoint_url
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "local")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "local")
+    os.environ["KEY_LEDGER"] = "false"
+    os.environ["ENVIRONMENT"] = "bench"
+    table_name = f"bench-writes-{uuid.uuid4().hex[:8]}"
+    os.environ["DYNAMODB_TABLE_NAME"] = table_name
+
+    _create_table(table_name)
+    results = []
+    try:
+        for target in args.targets:
+            for shape in args.shapes:
+                for count in args.scales:
+                    with ProcessPoolExecutor(max_workers=1) as executor:
+                        result = executor.submit(
+                            _run_case, target, shape, count
+                        ).result()
+                    results.append(result)
+                    print(
+                        f"{target:<30} {shape:<8} {count:>7} items "
+                        f"{result['items_per_second']:>10.1f} items/s "
+                        f"p95 batch {result['p95_batch_ms']:>8.2f} ms "
+                        f"peak RSS {result['peak_rss_mb']:>7.1f} MB"
+                    )
+    finally:
+        _delete_table(table_name)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(
+            {
+                "run_at": datetime.now(timezone.utc).isoformat(),
+                "endpoint_url": os.environ["DYNAMODB_ENDPOINT_URL"],
+                "write_workers": os.getenv("DYNAMO_WRITE_WORKERS"),
+                "results": results,
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    print(f"\nResults written to {args.output}")
+
+    if previous is not None:
+        _print_comparison(results, previous, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark of the JSON codec backends on the repository's data files.
+
+Decodes every scenario, config and expected response file, and re-encodes
+the configs pretty-printed as S3ConfigManager does, through utils.json_codec
+with each backend it supports: the standard library and (if installed)
+orjson. Run from the repository root:
+
+    poetry run python -m tests.benchmarks.bench_json_codec
+"""
+
+import timeit
+from pathlib import Path
+
+from tests import test_config
+from utils import json_codec
+
+# Listed explicitly, as data/dynamoDB/temp/ holds harness files that are
+# not all JSON
+SCENARIO_FOLDERS = [
+    test_config.SMOKE_TEST_DATA,
+    test_config.STORY_TEST_DATA,
+    test_config.REGRESSION_TEST_DATA,
+    test_config.IN_PROGRESS_TEST_DATA,
+    test_config.VITA_INTEGRATION_TEST_DATA,
+    test_config.NBS_INTEGRATION_TEST_DATA,
+    test_config.PERFORMANCE_TEST_DATA,
+]
+DATA_GLOBS = {
+    "configs": "data/configs/**/*.json",
+    "responses": "data/responses/*/*.json",
+}
+REPEATS = 5
+NUMBER = 5
+
+
+def _backends() -> list[str]:
+    return ["json", "orjson"] if json_codec.orjson is not None else ["json"]
+
+
+def _best_seconds(fn) -> float:
+    return min(timeit.repeat(fn, repeat=REPEATS, number=NUMBER)) / NUMBER
+
+
+def _data_files() -> dict[str, list[bytes]]:
+    files = {
+        "scenarios": [
+            path.read_bytes()
+            for folder in SCENARIO_FOLDERS
+            for path in sorted(Path(folder).glob("*.json"))
+        ]
+    }
+    for name, pattern in DATA_GLOBS.items():
+        files[name] = [path.read_bytes() for path in sorted(Path().glob(pattern))]
+    return files
+
+
+def main() -> None:
+    files = _data_files()
+    configs = [json_codec.loads(raw) for raw in files["configs"]]
+
+    if json_codec.orjson is None:
+        print("orjson is not installed; only the stdlib backend is measured")
+
+    default_backend = json_codec.BACKEND
+    try:
+        for backend in _backends():
+            json_codec.BACKEND = backend
+            for name, raw_files in files.items():
+                size_mb = sum(len(raw) for raw in raw_files) / 1_000_000
+                seconds = _best_seconds(
+                    lambda: [json_codec.loads(raw) for raw in raw_files]
+                )
+                print(
+                    f"{backend:<7} decode {name:<10} {len(raw_files):4d} files "
+                    f"{seconds * 1000:8.2f} ms ({size_mb / seconds:6.1f} MB/s)"
+                )
+
+            seconds = _best_seconds(
+                lambda: [json_codec.dumps(config, indent=True) for config in configs]
+            )
+            print(
+                f"{backend:<7} encode configs    {len(configs):4d} files "
+                f"{seconds * 1000:8.2f} ms (indent=2)"
+            )
+    finally:
+        json_codec.BACKEND = default_backend
+
+
+if __name__ == "__main__":
+    main()
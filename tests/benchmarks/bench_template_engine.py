@@ -0,0 +1,90 @@
+"""Micro-benchmark for TemplateEngine.apply.
+
+Compares the copy-on-write merge against the previous implementation, which
+deep-copied the built template for every item, over the scenario data in
+data/dynamoDB. Run from the repository root:
+
+    poetry run python -m tests.benchmarks.bench_template_engine
+"""
+
+import copy
+import json
+import timeit
+from pathlib import Path
+
+from utils.data_template_resolver import TemplateEngine
+
+SCENARIO_FOLDERS = [
+    "data/dynamoDB/storyTestData",
+    "data/dynamoDB/vitaIntegrationTestData",
+    "data/dynamoDB/nbsIntegrationTestData",
+    "data/dynamoDB/performanceTestData",
+]
+REPEATS = 5
+NUMBER = 20
+
+
+def _load_scenario_data() -> list[list[dict]]:
+    scenario_data = []
+    for folder in SCENARIO_FOLDERS:
+        for path in sorted(Path(folder).glob("*.json")):
+            with path.open() as f:
+                data = json.load(f).get("data")
+            if data is not None:
+                scenario_data.append(data)
+    return scenario_data
+
+
+def _deepcopy_apply(engine: TemplateEngine, scenario_data: list[dict]) -> list[dict]:
+    """The pre copy-on-write implementation of TemplateEngine.apply."""
+    templates = {
+        item[TemplateEngine.MERGE_KEY]: copy.deepcopy(item) for item in engine.build()
+    }
+    resolved = []
+    for item in scenario_data:
+        merged = copy.deepcopy(templates[item.get(TemplateEngine.MERGE_KEY)])
+        merged.update(item)
+        resolved.append(merged)
+    return resolved
+
+
+def main() -> None:
+    engine = TemplateEngine.create()
+    scenario_data = _load_scenario_data()
+    item_count = sum(len(data) for data in scenario_data)
+
+    for data in scenario_data:
+        expected = json.dumps(_deepcopy_apply(engine, data))
+        assert json.dumps(engine.apply(data)) == expected, "Output differs"
+
+    # Pre-build the reference templates so both sides time only the merge
+    reference_templates = {
+        item[TemplateEngine.MERGE_KEY]: item for item in engine.build()
+    }
+
+    def run_deepcopy():
+        for data in scenario_data:
+            for item in data:
+                merged = copy.deepcopy(
+                    reference_templates[item[TemplateEngine.MERGE_KEY]]
+                )
+                merged.update(item)
+
+    def run_copy_on_write():
+        for data in scenario_data:
+            engine.apply(data)
+
+    results = {}
+    for name, fn in [("deepcopy", run_deepcopy), ("copy-on-write", run_copy_on_write)]:
+        best = min(timeit.repeat(fn, repeat=REPEATS, number=NUMBER)) / NUMBER
+        results[name] = best
+        print(
+            f"{name:<14} {best * 1000:8.2f} ms per pass "
+            f"({item_count / best:,.0f} items/s, {len(scenario_data)} scenarios)"
+        )
+
+    print(f"speed-up: {results['deepcopy'] / results['copy-on-write']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
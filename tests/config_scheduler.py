@@ -0,0 +1,178 @@
+"""Pytest plugin that runs tests sharing an S3 config set back to back.
+
+Every data-driven test uploads its scenario's config_filenames to S3 before
+calling the API, so each change of config set between consecutive tests
+costs a sync of the rules bucket. Within each module, tests are grouped by
+config set in the order each set first appears. Tests without a scenario
+keep their place and are not grouped across, so anything they rely on about
+the tests before or after them still holds.
+
+With --config-coresidency, config sets that can share the bucket without
+changing each other's results are merged (see utils.config_coresidency).
+Each merged group is uploaded once and all of its tests run against it;
+tests read the merged configs to upload from the coresident_configs fixture.
+
+Pass --no-config-grouping to run tests in collection order.
+"""
+
+import logging
+
+import pytest
+
+from tests import test_config
+from utils.config_coresidency import load_consumer_campaigns, plan_coresident_groups
+
+logger = logging.getLogger(__name__)
+
+_coresident_configs = pytest.StashKey[list]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-config-grouping",
+        action="store_true",
+        default=False,
+        help="Run tests in collection order instead of grouping tests that "
+        "share an S3 config set.",
+    )
+    parser.addoption(
+        "--config-coresidency",
+        action="store_true",
+        default=False,
+        help="Upload compatible config sets together and run all of their "
+        "tests against one upload.",
+    )
+
+
+def coresident_config_filenames(item) -> list[str] | None:
+    """Return the configs to upload for a test planned to share the bucket, if any."""
+    return item.stash.get(_coresident_configs, None)
+
+
+@pytest.fixture
+def coresident_configs(request) -> list[str] | None:
+    """The configs to upload for the requesting test if it shares the bucket, else None."""
+    return coresident_config_filenames(request.node)
+
+
+def _scenario(item) -> dict | None:
+    callspec = getattr(item, "callspec", None)
+    scenario = callspec.params.get("scenario") if callspec else None
+    return scenario if isinstance(scenario, dict) else None
+
+
+def config_set_key(item):
+    """Return the config set a test uploads before running, or None if it uploads none."""
+    scenario = _scenario(item)
+    if scenario is None:
+        return None
+    # Modules upload the same filenames from their own config directories
+    config_path = getattr(getattr(item, "module", None), "config_path", None)
+    config_filenames = coresident_config_filenames(item)
+    if config_filenames is None:
+        config_filenames = scenario.get("config_filenames") or ()
+    return str(config_path), frozenset(config_filenames)
+
+
+def count_config_switches(items) -> int:
+    """Count the config uploads running ``items`` in order would trigger."""
+    switches = 0
+    current = None
+    for item in items:
+        key = config_set_key(item)
+        if key is not None and key != current:
+            switches += 1
+            current = key
+    return switches
+
+
+def _scenario_runs(items):
+    """Yield each module's runs of scenario tests, and tests without a scenario alone."""
+    run = []
+    module = None
+    for item in items:
+        key = config_set_key(item)
+        item_module = getattr(item, "module", None)
+        if run and (key is None or item_module is not module):
+            yield run
+            run = []
+        if key is None:
+            yield [item]
+        else:
+            run.append(item)
+            module = item_module
+    if run:
+        yield run
+
+
+def _group_run(run) -> dict:
+    groups: dict = {}
+    for item in run:
+        groups.setdefault(config_set_key(item), []).append(item)
+    return groups
+
+
+def group_by_config_set(items) -> list:
+    """Return ``items`` with each module's runs of scenario tests grouped by config set."""
+    return [
+        item
+        for run in _scenario_runs(items)
+        for group in _group_run(run).values()
+        for item in group
+    ]
+
+
+def plan_coresident_uploads(items, consumer_campaigns) -> list:
+    """Return ``items`` with compatible config sets merged into shared uploads.
+
+    Each test is told the merged configs to upload through the
+    coresident_configs fixture.
+    """
+    planned = []
+    for run in _scenario_runs(items):
+        config_path = getattr(getattr(run[0], "module", None), "config_path", None)
+        if config_set_key(run[0]) is None or config_path is None:
+            planned.extend(group_by_config_set(run))
+            continue
+
+        units = list(_group_run(run).items())
+        for unit_indexes in plan_coresident_groups(
+            [
+                (config_filenames, [_scenario(item) for item in unit_items])
+                for (_, config_filenames), unit_items in units
+            ],
+            config_path,
+            consumer_campaigns,
+        ):
+            config_filenames = sorted(
+                {name for index in unit_indexes for name in units[index][0][1]}
+            )
+            for index in unit_indexes:
+                for item in units[index][1]:
+                    item.stash[_coresident_configs] = config_filenames
+                    planned.append(item)
+    return planned
+
+
+# After pytest's own -k and -m deselection, so only selected tests are counted
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session, config, items):
+    if config.getoption("--no-config-grouping"):
+        return
+
+    before = count_config_switches(items)
+    if config.getoption("--config-coresidency"):
+        items[:] = plan_coresident_uploads(
+            items, load_consumer_campaigns(test_config.CONSUMER_MAPPING_FILE)
+        )
+    else:
+        items[:] = group_by_config_set(items)
+    after = count_config_switches(items)
+    if before:
+        logger.info(
+            "Grouped tests by S3 config set: %d config switches instead of %d "
+            "(%d saved)",
+            after,
+            before,
+            before - after,
+        )
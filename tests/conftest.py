@@ -6,7 +6,10 @@ from dotenv import load_dotenv
 
 from tests import test_config
 
+from utils.aws_clients import log_client_creations
+from utils.data_helper import seed_scenarios_for_items
 from utils.eligibility_api_client import EligibilityApiClient
+from utils.json_codec import log_codec_timings
 from utils.s3_config_manager import (
     upload_configs_to_s3,
     upload_consumer_mapping_file_to_s3,
@@ -14,6 +17,7 @@ from utils.s3_config_manager import (
 
 load_dotenv()
 
+pytest_plugins = ["tests.config_scheduler"]
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +30,13 @@ def pytest_addoption(parser):
         default="",
         help="Specify the environment for testing: 'dev', 'test' or 'preprod'",
     )
+    parser.addoption(
+        "--scenario",
+        action="append",
+        default=[],
+        help="Only load data-driven scenarios matching this filename (or glob), "
+        "NHS number or part of the scenario name. May be repeated.",
+    )
 
 
 def pytest_configure(config):
@@ -51,6 +62,9 @@ def pytest_configure(config):
     os.environ["DYNAMODB_TABLE_NAME"] = (
         f"eligibility-signposting-api-{env}-eligibility_datastore"
     )
+    scenario_selectors = config.getoption("--scenario")
+    if scenario_selectors:
+        os.environ["SCENARIO_SELECTION"] = "\n".join(scenario_selectors)
 
     assert os.getenv("BASE_URL") is not None, "BASE_URL must be set"
     assert (
@@ -76,6 +90,11 @@ def pytest_configure(config):
     return
 
 
+def pytest_sessionfinish(session, exitstatus):
+    log_codec_timings()
+    log_client_creations()
+
+
 @pytest.fixture(scope="session")
 def eligibility_client():
     return EligibilityApiClient(cert_dir="certs")
@@ -86,10 +105,14 @@ def upload_consumer_mapping_once():
     upload_consumer_mapping_file_to_s3(test_config.CONSUMER_MAPPING_FILE)
 
 
-@pytest.fixture
-def get_scenario_params(request):
-    _ = request
+@pytest.fixture(scope="session", autouse=True)
+def seed_dynamo_for_selected_tests(request):
+    """Write DynamoDB data for the scenarios of the selected tests only."""
+    seed_scenarios_for_items(request.session.items)
+
 
+@pytest.fixture
+def get_scenario_params(coresident_configs):
     def _setup(scenario, config_path):
         nhs_number = scenario["nhs_number"]
         config_filenames = scenario.get("config_filenames", [])
@@ -97,7 +120,11 @@ def get_scenario_params(request):
         query_params = scenario.get("query_params", {})
         expected_response_code = scenario["expected_response_code"]
 
-        upload_configs_to_s3(config_filenames, config_path)
+        # Tests planned to share the bucket upload their whole group's configs
+        upload_configs_to_s3(
+            coresident_configs or config_filenames,
+            config_path,
+        )
 
         return (
             nhs_number,
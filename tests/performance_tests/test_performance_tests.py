@@ -11,7 +11,7 @@ import boto3
 import pytest
 
 from tests import test_config
-from utils.data_helper import initialise_tests
+from utils.data_helper import initialise_tests, seed_scenarios
 from .xray_query_helper import (
     collect_xray_metrics,
     log_xray_metrics,
@@ -224,6 +224,9 @@ def temp_csv_path() -> Path:
 
 @pytest.fixture(scope="function")
 def test_data(get_scenario_params, temp_csv_path) -> None:
+    # The locust run uses every scenario, so seed them all
+    seed_scenarios(all_data.values())
+
     for _, scenario in param_list:
         (
             nhs_number,
@@ -8,6 +8,8 @@ from typing import Any
 
 import boto3
 
+from utils import json_codec
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -159,7 +161,7 @@ def _load_segment_document(
         return None
 
     try:
-        return json.loads(document)
+        return json_codec.loads(document, site="xray_segment")
     except json.JSONDecodeError:
         logger.warning(
             "XRAY: Could not parse segment document for trace %s",
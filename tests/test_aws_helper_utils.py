@@ -0,0 +1,613 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from utils.dynamo_bulk_writer import DynamoBulkWriter
+from utils.dynamo_readiness import wait_for_keys
+from utils.dynamo_serialization import serialize_item
+from utils.dynamo_snapshot import SnapshotWriter, read_snapshot
+from utils.key_ledger import read_keys
+from utils import aws_clients, data_helper, dynamo_helper, json_codec
+from utils.dynamo_helper import (
+    DynamoDBHelper,
+    cleanup_run_keys,
+    reset_dynamo_tables,
+    restore_dynamo_snapshot,
+)
+from utils.s3_config_manager import S3ConfigManager
+from utils.s3_config_sync import content_digest, digest_metadata
+
+# ---------------------------------------------------------------------------
+# 1. dynamo_bulk_writer.py — DynamoBulkWriter
+# ---------------------------------------------------------------------------
+
+
+def _client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "BatchWriteItem")
+
+
+@patch("utils.dynamo_bulk_writer.time.sleep")
+def test_bulk_writer_retries_unprocessed_items_and_reports_per_call_stats(mock_sleep):
+    """Unprocessed items are retried and client throttles counted; the last item for a key wins."""
+    client = MagicMock()
+    items = [
+        {"NHS_NUMBER": str(i), "ATTRIBUTE_TYPE": "PERSON", "AGE": 1} for i in range(30)
+    ]
+    items.append({"NHS_NUMBER": "0", "ATTRIBUTE_TYPE": "PERSON", "AGE": 2})
+    first_batch = None
+
+    def batch_write_item(RequestItems):
+        nonlocal first_batch
+        requests = RequestItems["table"]
+        if first_batch is None:
+            first_batch = requests
+            return {"UnprocessedItems": {"table": requests[:1]}}
+        if len(requests) == 1:
+            return {"UnprocessedItems": {}, "ResponseMetadata": {"RetryAttempts": 2}}
+        return {"UnprocessedItems": {}, "ResponseMetadata": {"RetryAttempts": 0}}
+
+    client.batch_write_item.side_effect = batch_write_item
+    writer = DynamoBulkWriter("table", client=client, max_workers=1)
+
+    stats = writer.write(items)
+    assert (stats["items"], stats["retries"], stats["throttles"]) == (30, 1, 2)
+    assert mock_sleep.call_count == 1
+    assert writer.write(items[1:6])["retries"] == 0
+    written = [
+        request["PutRequest"]["Item"]
+        for call in client.batch_write_item.call_args_list
+        for request in call.kwargs["RequestItems"]["table"]
+    ]
+    assert {"S": "0"} in [item["NHS_NUMBER"] for item in written]
+    assert all(
+        item["AGE"] == {"N": "2"}
+        for item in written
+        if item["NHS_NUMBER"] == {"S": "0"}
+    )
+
+
+def test_bulk_writer_sends_serialized_items_unchanged():
+    """Pre-serialized items go out as given, deduplicated by key."""
+    client = MagicMock()
+    client.batch_write_item.return_value = {}
+    plain = {"NHS_NUMBER": "1", "ATTRIBUTE_TYPE": "PERSON", "TAGS": [{"A": 1}]}
+    item = serialize_item(plain)
+    writer = DynamoBulkWriter("table", client=client, max_workers=1)
+
+    stats = writer.write_serialized([serialize_item(dict(plain, TAGS=[])), item])
+    assert stats["items"] == 1
+    (request,) = client.batch_write_item.call_args.kwargs["RequestItems"]["table"]
+    assert request["PutRequest"]["Item"] is item
+    assert item["TAGS"] == {"L": [{"M": {"A": {"N": "1"}}}]}
+
+
+@pytest.mark.parametrize(
+    "code", ["ValidationException", "ProvisionedThroughputExceededException"]
+)
+def test_bulk_writer_raises_errors_without_retrying_on_top_of_the_client(code):
+    """Throttling errors reach the writer only once the client's retries are spent."""
+    client = MagicMock()
+    client.batch_write_item.side_effect = _client_error(code)
+    writer = DynamoBulkWriter("table", client=client, max_workers=2)
+
+    with pytest.raises(ClientError):
+        writer.write([{"NHS_NUMBER": "1", "ATTRIBUTE_TYPE": "PERSON"}])
+    assert client.batch_write_item.call_count == 1
+
+
+def test_bulk_writer_shares_one_pool_sized_below_the_connection_pool(monkeypatch):
+    """Concurrent calls share the writer's pool and each get their own stats."""
+    monkeypatch.setenv("DYNAMO_WRITE_WORKERS", "64")
+    monkeypatch.setenv("AWS_MAX_POOL_CONNECTIONS", "10")
+    client = MagicMock()
+    client.batch_write_item.return_value = {}
+    writer = DynamoBulkWriter("table", client=client)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        counts = list(
+            executor.map(
+                lambda n: writer.write(
+                    [
+                        {"NHS_NUMBER": str(i), "ATTRIBUTE_TYPE": "PERSON"}
+                        for i in range(n)
+                    ]
+                )["items"],
+                [10, 40, 60, 5],
+            )
+        )
+
+    assert counts == [10, 40, 60, 5]
+    assert writer.max_workers == 9
+    assert writer.executor is writer.executor
+
+
+# ---------------------------------------------------------------------------
+# 2. dynamo_helper.py — truncating reset_dynamo_tables
+# ---------------------------------------------------------------------------
+
+
+@patch("utils.dynamo_helper.get_resource")
+@patch("utils.dynamo_helper.get_client")
+def test_truncate_deletes_every_scanned_key_across_segments(
+    mock_get_client, mock_get_resource
+):
+    helper = DynamoDBHelper("table", "dev")
+    helper._bulk_writer = DynamoBulkWriter("table", client=MagicMock(), max_workers=1)
+    helper._bulk_writer.client.batch_write_item.return_value = {}
+
+    def key(nhs_number, attribute_type):
+        return {
+            "NHS_NUMBER": {"S": nhs_number},
+            "ATTRIBUTE_TYPE": {"S": attribute_type},
+        }
+
+    pages = {
+        (0, None): {"Items": [key("1", "PERSON")], "LastEvaluatedKey": "k"},
+        (0, "k"): {"Items": [key("1", "COHORTS")]},
+        (1, None): {"Items": [key("2", "PERSON")]},
+    }
+    helper.dynamodb_client.scan.side_effect = lambda **kwargs: pages[
+        (kwargs["Segment"], kwargs.get("ExclusiveStartKey"))
+    ]
+
+    assert helper.truncate(segments=2) == 3
+    ((_, tag_kwargs),) = helper.dynamodb_client.tag_resource.call_args_list
+    assert [tag["Key"] for tag in tag_kwargs["Tags"]] == ["SeedResetGeneration"]
+    deleted = [
+        request["DeleteRequest"]["Key"]
+        for call in helper._bulk_writer.client.batch_write_item.call_args_list
+        for request in call.kwargs["RequestItems"]["table"]
+    ]
+    assert sorted(deleted, key=str) == sorted(
+        [key("1", "PERSON"), key("1", "COHORTS"), key("2", "PERSON")], key=str
+    )
+
+
+@pytest.mark.parametrize(
+    "item_count, expected_mode", [(10, "truncate"), (1_000_000, "recreate")]
+)
+@patch("utils.dynamo_helper.invalidate_seed_manifest")
+@patch("utils.dynamo_helper._recreate_table")
+@patch("utils.dynamo_helper.DynamoDBHelper")
+def test_reset_dynamo_tables_auto_mode_picks_path_by_item_count(
+    mock_helper_cls,
+    mock_recreate,
+    mock_invalidate,
+    item_count,
+    expected_mode,
+    monkeypatch,
+):
+    monkeypatch.setenv("ENVIRONMENT", "dev")
+    monkeypatch.setenv("DYNAMODB_TABLE_NAME", "table")
+    monkeypatch.delenv("DYNAMO_RESET_MODE", raising=False)
+    helper = mock_helper_cls.return_value
+    helper.item_count.return_value = item_count
+    helper.truncate.return_value = item_count
+
+    reset_dynamo_tables()
+
+    mock_invalidate.assert_called_once_with("dev", "table")
+    assert helper.truncate.called == (expected_mode == "truncate")
+    assert mock_recreate.called == (expected_mode == "recreate")
+
+
+# ---------------------------------------------------------------------------
+# 3. key_ledger.py — run-scoped key ledger and cleanup
+# ---------------------------------------------------------------------------
+
+
+def _isolate_ledgers_and_manifests(monkeypatch, directory):
+    monkeypatch.setenv("ENVIRONMENT", "dev")
+    monkeypatch.setenv("DYNAMODB_TABLE_NAME", "table")
+    monkeypatch.delenv("KEY_LEDGER", raising=False)
+    monkeypatch.delenv("TEST_RUN_ID", raising=False)
+    monkeypatch.setattr(
+        dynamo_helper,
+        "key_ledger_path",
+        lambda environment, table_name, run_id: directory
+        / f"{environment}-{table_name}-{run_id}.jsonl",
+    )
+    manifest_path = directory / "manifests" / "manifest.json"
+    for module in (dynamo_helper, data_helper):
+        monkeypatch.setattr(
+            module, "seed_manifest_path", lambda *args, **kwargs: manifest_path
+        )
+
+
+class _InMemoryTable:
+    """Stands in for DynamoBulkWriter, keeping the table's items in a dict."""
+
+    def __init__(self):
+        self.items = {}
+
+    def write(self, items):
+        for item in items:
+            self.items[(item["NHS_NUMBER"], item["ATTRIBUTE_TYPE"])] = item
+
+    def delete(self, keys):
+        for key in keys:
+            self.items.pop((key["NHS_NUMBER"], key["ATTRIBUTE_TYPE"]), None)
+
+
+@patch("utils.dynamo_helper.get_resource")
+@patch("utils.dynamo_helper.get_client")
+def test_cleanup_run_deletes_only_keys_recorded_by_the_run_alone(
+    mock_get_client, mock_get_resource, tmp_path, monkeypatch
+):
+    _isolate_ledgers_and_manifests(monkeypatch, tmp_path)
+    monkeypatch.setattr(DynamoDBHelper, "bulk_writer", MagicMock())
+    person = {"NHS_NUMBER": "1", "ATTRIBUTE_TYPE": "PERSON"}
+    cohorts = {"NHS_NUMBER": "1", "ATTRIBUTE_TYPE": "COHORTS"}
+
+    helper = DynamoDBHelper("table", "dev")
+    helper.insert_items([person])
+    assert not list(tmp_path.iterdir())
+    with pytest.raises(ValueError):
+        cleanup_run_keys()
+
+    monkeypatch.setenv("TEST_RUN_ID", "run-a")
+    helper.insert_items([person, cohorts])
+    helper.insert_items([person])
+    monkeypatch.setenv("TEST_RUN_ID", "run-c")
+    helper.insert_items([person])
+
+    cleanup_run_keys("run-b")
+    DynamoDBHelper.bulk_writer.delete.assert_not_called()
+
+    cleanup_run_keys("run-a")
+    DynamoDBHelper.bulk_writer.delete.assert_called_once_with([cohorts])
+    mock_get_client.return_value.tag_resource.assert_called_once()
+    assert not (tmp_path / "dev-table-run-a.jsonl").exists()
+    assert (tmp_path / "dev-table-run-c.jsonl").exists()
+
+
+@patch("utils.dynamo_helper.get_resource")
+@patch("utils.dynamo_helper.get_client")
+def test_cleanup_run_keeps_preloaded_items_the_run_overwrote(
+    mock_get_client, mock_get_resource, tmp_path, monkeypatch
+):
+    _isolate_ledgers_and_manifests(monkeypatch, tmp_path / "ledgers")
+    monkeypatch.setenv("DYNAMO_READINESS_TIMEOUT", "0")
+    monkeypatch.delenv("DYNAMO_FULL_RESEED", raising=False)
+    mock_get_client.return_value.describe_table.return_value = {
+        "Table": {"TableArn": "arn", "CreationDateTime": "2026-01-01"}
+    }
+    mock_get_client.return_value.list_tags_of_resource.return_value = {"Tags": []}
+    table = _InMemoryTable()
+    monkeypatch.setattr(DynamoDBHelper, "bulk_writer", table)
+    helper = DynamoDBHelper("table", "dev")
+    monkeypatch.setattr(data_helper, "get_dynamo_helper", lambda: helper)
+    preloaded = [{"NHS_NUMBER": str(i), "ATTRIBUTE_TYPE": "PERSON"} for i in range(10)]
+
+    data_helper._sync_dynamo_items(preloaded)
+    monkeypatch.setenv("TEST_RUN_ID", "r1")
+    helper.insert_items(
+        preloaded[:5] + [{"NHS_NUMBER": "new", "ATTRIBUTE_TYPE": "PERSON"}]
+    )
+    assert len(table.items) == 11
+
+    cleanup_run_keys()
+
+    assert sorted(table.items) == sorted(
+        (item["NHS_NUMBER"], item["ATTRIBUTE_TYPE"]) for item in preloaded
+    )
+
+
+# ---------------------------------------------------------------------------
+# 4. dynamo_readiness.py — read-back readiness barrier
+# ---------------------------------------------------------------------------
+
+
+def _batch_get_response(keys):
+    return {"Responses": {"table": keys}}
+
+
+@patch("utils.dynamo_readiness.time.sleep")
+def test_wait_for_keys_rereads_only_missing_keys(mock_sleep):
+    keys = [{"NHS_NUMBER": str(i), "ATTRIBUTE_TYPE": "PERSON"} for i in range(150)]
+    client = MagicMock()
+    requested = []
+
+    def batch_get_item(RequestItems):
+        request = RequestItems["table"]
+        assert request["ConsistentRead"] is True
+        requested.append(len(request["Keys"]))
+        # Key "0" only becomes visible on the second round
+        visible = [
+            key
+            for key in request["Keys"]
+            if key["NHS_NUMBER"] != {"S": "0"} or len(requested) > 2
+        ]
+        return _batch_get_response(visible)
+
+    client.batch_get_item.side_effect = batch_get_item
+
+    wait_for_keys(client, "table", keys, timeout_seconds=5, max_workers=1)
+
+    assert requested == [100, 50, 1]
+
+
+@patch("utils.dynamo_readiness.time.sleep")
+def test_wait_for_keys_times_out_when_keys_never_appear(mock_sleep):
+    client = MagicMock()
+    client.batch_get_item.return_value = _batch_get_response([])
+
+    with pytest.raises(TimeoutError, match="1 of 1 keys"):
+        wait_for_keys(
+            client,
+            "table",
+            [{"NHS_NUMBER": "1", "ATTRIBUTE_TYPE": "PERSON"}],
+            timeout_seconds=0,
+        )
+
+
+# ---------------------------------------------------------------------------
+# 5. aws_clients.py — shared client registry
+# ---------------------------------------------------------------------------
+
+
+@patch("utils.aws_clients.boto3.session.Session")
+def test_client_registry_shares_clients_and_gives_threads_own_resources(
+    mock_session_cls,
+):
+    """Clients are created once across threads; resources once per thread."""
+    session = mock_session_cls.return_value
+    session.client.side_effect = lambda *args, **kwargs: MagicMock()
+    session.resource.side_effect = lambda *args, **kwargs: MagicMock()
+    aws_clients.reset_clients()
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            clients = list(
+                executor.map(lambda _: aws_clients.get_client("s3"), range(20))
+            )
+        assert all(client is clients[0] for client in clients)
+        assert aws_clients.get_client("s3", "eu-west-2") is not clients[0]
+
+        main_resource = aws_clients.get_resource("dynamodb", "eu-west-2")
+        assert aws_clients.get_resource("dynamodb", "eu-west-2") is main_resource
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            other_resource = executor.submit(
+                aws_clients.get_resource, "dynamodb", "eu-west-2"
+            ).result()
+        assert other_resource is not main_resource
+
+        assert aws_clients.client_creations() == {
+            "client:s3": 2,
+            "resource:dynamodb": 2,
+        }
+        config = session.client.call_args.kwargs["config"]
+        assert config.retries["mode"] == "adaptive"
+    finally:
+        aws_clients.reset_clients()
+
+
+# ---------------------------------------------------------------------------
+# 6. dynamo_snapshot.py — table export and restore
+# ---------------------------------------------------------------------------
+
+
+@patch("utils.dynamo_helper.reset_dynamo_tables")
+@patch("utils.dynamo_bulk_writer.get_client")
+@patch("utils.dynamo_helper.get_resource")
+@patch("utils.dynamo_helper.get_client")
+def test_snapshot_exports_every_segment_and_restores_it_unchanged(
+    mock_get_client,
+    mock_get_resource,
+    mock_writer_get_client,
+    mock_reset,
+    tmp_path,
+    monkeypatch,
+):
+    monkeypatch.setenv("ENVIRONMENT", "dev")
+    monkeypatch.setenv("DYNAMODB_TABLE_NAME", "table")
+    items = [
+        {
+            "NHS_NUMBER": {"S": str(i)},
+            "ATTRIBUTE_TYPE": {"S": "COHORTS"},
+            "COHORT_MEMBERSHIPS": {"L": [{"M": {"COHORT_LABEL": {"S": "x"}}}]},
+        }
+        for i in range(3)
+    ]
+    pages = {
+        (0, None): {"Items": items[:1], "LastEvaluatedKey": "k"},
+        (0, "k"): {"Items": items[1:2]},
+        (1, None): {"Items": items[2:]},
+    }
+    client = mock_writer_get_client.return_value = mock_get_client.return_value
+    client.scan.side_effect = lambda **kwargs: pages[
+        (kwargs["Segment"], kwargs.get("ExclusiveStartKey"))
+    ]
+    path = tmp_path / "snapshot.jsonl.gz"
+
+    with SnapshotWriter(path) as writer:
+        exported = DynamoDBHelper("table", "dev").export_items(writer, segments=2)
+
+    assert exported == writer.count == 3
+    assert sorted(read_snapshot(path), key=str) == sorted(items, key=str)
+
+    client.batch_write_item.return_value = {}
+    ledger_path = tmp_path / "ledger.jsonl"
+    monkeypatch.setenv("TEST_RUN_ID", "run-a")
+    monkeypatch.delenv("KEY_LEDGER", raising=False)
+    monkeypatch.setattr(
+        dynamo_helper, "key_ledger_path", lambda *args, **kwargs: ledger_path
+    )
+    restore_dynamo_snapshot(path)
+
+    mock_reset.assert_called_once()
+    restored = [
+        request["PutRequest"]["Item"]
+        for call in client.batch_write_item.call_args_list
+        for request in call.kwargs["RequestItems"]["table"]
+    ]
+    assert sorted(restored, key=str) == sorted(items, key=str)
+    assert sorted(read_keys(ledger_path), key=str) == sorted(
+        [{"NHS_NUMBER": str(i), "ATTRIBUTE_TYPE": "COHORTS"} for i in range(3)],
+        key=str,
+    )
+
+
+def test_failed_snapshot_export_keeps_the_previous_snapshot(tmp_path):
+    path = tmp_path / "snapshot.jsonl.gz"
+    with SnapshotWriter(path) as writer:
+        writer.write([{"NHS_NUMBER": {"S": "1"}}])
+
+    with pytest.raises(RuntimeError):
+        with SnapshotWriter(path) as writer:
+            writer.write([{"NHS_NUMBER": {"S": "2"}}])
+            raise RuntimeError("scan failed")
+
+    assert list(read_snapshot(path)) == [{"NHS_NUMBER": {"S": "1"}}]
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+
+
+# ---------------------------------------------------------------------------
+# 7. s3_config_manager.py — digest-based config sync
+# ---------------------------------------------------------------------------
+
+
+def _s3_bucket_client(objects: dict[str, dict]):
+    """A mock S3 client over ``objects``, a map of key to user metadata."""
+    client = MagicMock()
+    # Two pages, to exercise pagination
+    client.get_paginator.return_value.paginate.side_effect = lambda **kwargs: [
+        {"Contents": [{"Key": key} for key in list(objects)[:1]]},
+        {"Contents": [{"Key": key} for key in list(objects)[1:]]},
+    ]
+    client.head_object.side_effect = lambda Bucket, Key: {
+        "Metadata": dict(objects[Key])
+    }
+    client.put_object.side_effect = lambda **kwargs: objects.__setitem__(
+        kwargs["Key"], kwargs["Metadata"]
+    )
+
+    def delete_objects(Bucket, Delete):
+        for obj in Delete["Objects"]:
+            objects.pop(obj["Key"])
+        return {}
+
+    client.delete_objects.side_effect = delete_objects
+    return client
+
+
+@patch("utils.s3_config_manager.get_client")
+def test_config_sync_only_touches_configs_whose_digest_differs(
+    mock_get_client, tmp_path
+):
+    """Matching configs are skipped across managers; no object body is downloaded."""
+    paths = []
+    for name in ("a.json", "b.json", "d.json"):
+        path = tmp_path / name
+        path.write_text(json.dumps({"name": name}))
+        paths.append(path)
+    digest_of_a = content_digest(
+        json_codec.dumps({"name": "a.json"}, indent=True).encode("utf-8")
+    )
+    objects = {
+        "a.json": digest_metadata(digest_of_a),
+        "b.json": {},  # uploaded before digests were recorded
+        "c.json": digest_metadata("stale"),
+    }
+    client = mock_get_client.return_value = _s3_bucket_client(objects)
+
+    S3ConfigManager("bucket").upload_all_configs(paths)
+
+    assert sorted(call.kwargs["Key"] for call in client.put_object.call_args_list) == [
+        "b.json",
+        "d.json",
+    ]
+    assert sorted(objects) == ["a.json", "b.json", "d.json"]
+    client.get_object.assert_not_called()
+
+    # A later run starts with a fresh manager and finds nothing to do
+    client.reset_mock()
+    S3ConfigManager("bucket").upload_all_configs(paths)
+    client.put_object.assert_not_called()
+    client.delete_objects.assert_not_called()
+
+
+@patch("utils.s3_config_manager.get_client")
+def test_config_sync_deletes_stale_keys_in_batches_of_1000(mock_get_client, tmp_path):
+    objects = {f"stale_{i}.json": digest_metadata("stale") for i in range(2_500)}
+    client = mock_get_client.return_value = _s3_bucket_client(objects)
+
+    S3ConfigManager("bucket").upload_all_configs([])
+
+    assert sorted(
+        len(call.kwargs["Delete"]["Objects"])
+        for call in client.delete_objects.call_args_list
+    ) == [500, 1_000, 1_000]
+    assert objects == {}
+
+
+@patch("utils.s3_config_manager.get_client")
+def test_delete_all_lists_every_prefix_and_reports_failures_from_all_batches(
+    mock_get_client,
+):
+    keys = [f"root_{i}.json" for i in range(1_500)] + [
+        f"{folder}/{i}.json" for folder in ("a", "b") for i in range(1_200)
+    ]
+    client = mock_get_client.return_value
+
+    def paginate(Bucket, Prefix="", Delimiter=None):
+        matching = [key for key in keys if key.startswith(Prefix)]
+        if Delimiter:
+            folders = sorted(
+                {key.split("/")[0] + "/" for key in matching if "/" in key}
+            )
+            matching = [key for key in matching if "/" not in key]
+            yield {"CommonPrefixes": [{"Prefix": folder} for folder in folders]}
+        # Pages of 1000, as S3 returns them
+        for i in range(0, len(matching), 1_000):
+            yield {"Contents": [{"Key": key} for key in matching[i : i + 1_000]]}
+
+    client.get_paginator.return_value.paginate.side_effect = paginate
+
+    def delete_objects(Bucket, Delete):
+        failed = [obj for obj in Delete["Objects"] if obj["Key"].endswith("/7.json")]
+        return {
+            "Errors": [{"Key": obj["Key"], "Code": "AccessDenied"} for obj in failed]
+        }
+
+    client.delete_objects.side_effect = delete_objects
+
+    with pytest.raises(RuntimeError, match="Failed to delete 2 of 3900") as error:
+        S3ConfigManager("bucket").delete_all()
+
+    assert "a/7.json (AccessDenied)" in str(error.value)
+    assert "b/7.json (AccessDenied)" in str(error.value)
+    batches = [
+        call.kwargs["Delete"]["Objects"]
+        for call in client.delete_objects.call_args_list
+    ]
+    assert sorted(obj["Key"] for batch in batches for obj in batch) == sorted(keys)
+    assert max(len(batch) for batch in batches) == 1_000
+
+
+@patch("utils.s3_config_manager.get_client")
+def test_delete_reports_a_failed_batch_request_with_other_batches_errors(
+    mock_get_client,
+):
+    keys = [f"stale_{i:04}.json" for i in range(2_500)]
+    client = mock_get_client.return_value
+
+    def delete_objects(Bucket, Delete):
+        batch = [obj["Key"] for obj in Delete["Objects"]]
+        if "stale_0000.json" in batch:
+            raise _client_error("SlowDown")
+        return {"Errors": [{"Key": batch[0], "Code": "AccessDenied"}]}
+
+    client.delete_objects.side_effect = delete_objects
+
+    with pytest.raises(RuntimeError, match="Failed to delete 1002 of 2500") as error:
+        S3ConfigManager("bucket")._delete_keys(keys)
+
+    assert "batch of 1000 from stale_0000.json" in str(error.value)
+    assert "SlowDown" in str(error.value)
+    assert "stale_1000.json (AccessDenied)" in str(error.value)
+    assert "stale_2000.json (AccessDenied)" in str(error.value)
+    assert isinstance(error.value.__cause__, ClientError)
+    assert client.delete_objects.call_count == 3
@@ -0,0 +1,11 @@
+"""Deletes the DynamoDB keys written by one test run.
+
+The run is chosen with TEST_RUN_ID; only the keys in that run's key ledger
+are removed, so other runs sharing the table are unaffected.
+"""
+
+from utils.dynamo_helper import cleanup_run_keys
+
+
+def test_cleanup_run():
+    cleanup_run_keys()
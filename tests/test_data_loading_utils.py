@@ -0,0 +1,571 @@
+import hashlib
+import hmac
+import json
+import sys
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from tests.config_scheduler import count_config_switches, group_by_config_set
+from utils import data_helper, hashing_engine, json_codec, scenario_manifest
+from utils.config_coresidency import plan_coresident_groups
+from utils.data_helper import (
+    ExpectedResponseStore,
+    initialise_tests,
+    iter_test_scenarios,
+    load_all_test_scenarios,
+    seed_scenarios_for_items,
+)
+from utils.data_template_resolver import TemplateEngine
+from utils.document_transformer import transform_document
+from utils.hashing_engine import NhsNumberHasher
+from utils.placeholder_utils import LONDON_TZ, PlaceholderResolver
+from utils.scenario_cache import ScenarioCache
+from utils.scenario_manifest import load_scenario_manifest, select_scenario_files
+from utils.seed_pipeline import (
+    iter_batches,
+    iter_unique_items,
+    write_batches_in_background,
+)
+
+# ---------------------------------------------------------------------------
+# 1. data_helper.py — parallel load_all_test_scenarios
+# ---------------------------------------------------------------------------
+
+
+def test_load_all_test_scenarios_parallel_keeps_order_and_skips_errors(tmp_path):
+    """Scenarios loaded across a pool come back sorted by filename; bad files are skipped."""
+    for name in ["c.json", "A.json", "b.json"]:
+        (tmp_path / name).write_text(
+            '{"scenario_name": "%s", "data": [{"NHS_NUMBER": "1"}]}' % name,
+            encoding="utf-8",
+        )
+    (tmp_path / "broken.json").write_text("{ bad json", encoding="utf-8")
+
+    mock_engine = MagicMock()
+    mock_engine.apply.side_effect = lambda data: data
+
+    with patch("utils.data_helper.TemplateEngine.create", return_value=mock_engine):
+        result = load_all_test_scenarios(tmp_path, max_workers=4, use_cache=False)
+
+    assert list(result) == ["A.json", "b.json", "c.json"]
+    assert result["b.json"]["scenario_name"] == "b.json"
+
+
+def test_iter_test_scenarios_streams_in_order_with_bounded_work_in_flight(tmp_path):
+    """Streamed scenarios keep filename order, but files are only loaded as they are consumed."""
+    names = [f"{i}.json" for i in range(6)]
+    for name in names:
+        (tmp_path / name).write_text(
+            '{"scenario_name": "%s", "data": [{"NHS_NUMBER": "1"}]}' % name,
+            encoding="utf-8",
+        )
+    (tmp_path / "3.json").write_text("{ bad json", encoding="utf-8")
+
+    mock_engine = MagicMock()
+    mock_engine.apply.side_effect = lambda data: data
+
+    with patch("utils.data_helper.TemplateEngine.create", return_value=mock_engine):
+        scenarios = iter_test_scenarios(tmp_path, max_workers=1)
+        first = next(scenarios)
+        loaded_before_rest = mock_engine.apply.call_count
+        rest = list(scenarios)
+
+    assert first[0] == "0.json"
+    assert loaded_before_rest <= 2
+    assert [name for name, _ in rest] == ["1.json", "2.json", "4.json", "5.json"]
+    assert list(iter_test_scenarios(tmp_path / "missing")) == []
+
+
+# ---------------------------------------------------------------------------
+# 2. scenario_cache.py — compiled scenario cache
+# ---------------------------------------------------------------------------
+
+
+def test_load_all_test_scenarios_warm_run_skips_templating(tmp_path):
+    """A second load of unchanged files is served from the cache without templating."""
+    data_dir = tmp_path / "scenarios"
+    data_dir.mkdir()
+    (data_dir / "a.json").write_text(
+        '{"scenario_name": "a", "data": [{"NHS_NUMBER": "1"}]}', encoding="utf-8"
+    )
+
+    mock_engine = MagicMock()
+    mock_engine.apply.side_effect = lambda data: data
+    cache = ScenarioCache(cache_dir=tmp_path / "cache")
+
+    with (
+        patch("utils.data_helper.TemplateEngine.create", return_value=mock_engine),
+        patch("utils.data_helper._scenario_cache", cache),
+    ):
+        cold = load_all_test_scenarios(data_dir, use_cache=True)
+        warm = load_all_test_scenarios(data_dir, use_cache=True)
+
+    assert warm == cold
+    assert mock_engine.apply.call_count == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+# ---------------------------------------------------------------------------
+# 3. placeholder_utils.py — PlaceholderResolver
+# ---------------------------------------------------------------------------
+
+
+def test_placeholder_resolver_uses_frozen_clock_and_memoizes():
+    """Date tokens resolve against the snapshot and are only computed once."""
+    resolver = PlaceholderResolver(
+        now=datetime(2024, 2, 29, 23, 59, 59, tzinfo=LONDON_TZ)
+    )
+
+    assert resolver.resolve("<<DATE_DAY_1>>", "f.json") == "20240301"
+    assert resolver.resolve("dob <<DATE_AGE_1>>", "f.json") == "dob 20230228"
+    assert resolver.resolve("<<RANDOM_GUID>>", "f.json") == "RANDOM_GUID"
+    assert resolver.resolve("no placeholders", "f.json") == "no placeholders"
+
+    with patch("utils.placeholder_utils._resolve_placeholder_value") as mock_resolve:
+        resolver.resolve("<<DATE_DAY_1>>", "f.json")
+    mock_resolve.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# 4. document_transformer.py — transform_document
+# ---------------------------------------------------------------------------
+
+
+def test_transform_document_masks_resolves_and_captures_in_one_pass():
+    """Masking, placeholder resolution and NHS number capture keep document order."""
+    resolver = PlaceholderResolver(now=datetime(2025, 1, 1, tzinfo=LONDON_TZ))
+    document = [
+        {"ATTRIBUTE_TYPE": "PERSON", "NHS_NUMBER": "", "id": {"nested": 1}},
+        {"NHS_NUMBER": "9000000001", "DATE": "<<DATE_DAY_1>>"},
+        {"nhsNumber": "9000000002"},
+    ]
+
+    result, nhs_number = transform_document(
+        document,
+        "f.json",
+        resolver=resolver,
+        mask_keys=["id"],
+        capture_nhs_number=True,
+    )
+
+    assert nhs_number == "9000000001"
+    assert result[0] == {
+        "ATTRIBUTE_TYPE": "PERSON",
+        "NHS_NUMBER": "",
+        "id": "<ignored>",
+    }
+    assert result[1]["DATE"] == "20250102"
+    assert document[1]["DATE"] == "<<DATE_DAY_1>>"
+
+
+def test_transform_document_handles_documents_deeper_than_recursion_limit():
+    """Deeply nested documents are copied without recursion."""
+    depth = sys.getrecursionlimit() * 2
+    document = current = []
+    for _ in range(depth):
+        current.append([])
+        current = current[0]
+
+    result, _ = transform_document(document)
+
+    copied_depth = 0
+    while result:
+        result = result[0]
+        copied_depth += 1
+    assert copied_depth == depth
+
+
+# ---------------------------------------------------------------------------
+# 5. data_helper.py — ExpectedResponseStore
+# ---------------------------------------------------------------------------
+
+
+def test_expected_response_store_loads_files_on_demand(tmp_path):
+    """Only requested files are parsed; unreadable files behave as missing keys."""
+    (tmp_path / "a.json").write_text('{"id": "1", "value": "a"}', encoding="utf-8")
+    (tmp_path / "b.json").write_text('{"value": "b"}', encoding="utf-8")
+    (tmp_path / "bad.json").write_text("NOT JSON", encoding="utf-8")
+
+    store = ExpectedResponseStore(tmp_path, max_cached=1)
+
+    with patch(
+        "utils.data_helper._load_expected_response",
+        wraps=data_helper._load_expected_response,
+    ) as mock_load:
+        assert store["a.json"] == {"response_items": {"id": "<ignored>", "value": "a"}}
+        assert store.get("a.json") is store["a.json"]
+        assert store.get("bad.json", {}) == {}
+        assert store.get("missing.json") is None
+
+    assert [call.args[0].name for call in mock_load.call_args_list] == [
+        "a.json",
+        "bad.json",
+    ]
+    assert list(store) == ["a.json", "b.json", "bad.json"]
+
+
+# ---------------------------------------------------------------------------
+# 6. data_helper.py — deferred DynamoDB seeding
+# ---------------------------------------------------------------------------
+
+
+@patch.dict("utils.data_helper._pending_seed_scenarios", clear=True)
+@patch("utils.data_helper._insert_scenarios_into_dynamo")
+@patch("utils.data_helper.load_all_test_scenarios")
+def test_seeding_is_deferred_to_selected_items(mock_load, mock_insert, monkeypatch):
+    """initialise_tests writes nothing; only scenarios of selected items are seeded, once."""
+    monkeypatch.delenv("DYNAMO_PRELOADED", raising=False)
+    selected_scenario = {"dynamo_items": [{"NHS_NUMBER": "1"}]}
+    other_scenario = {"dynamo_items": [{"NHS_NUMBER": "2"}]}
+    mock_load.return_value = {"a.json": selected_scenario, "b.json": other_scenario}
+
+    initialise_tests("some/folder")
+    mock_insert.assert_not_called()
+
+    selected_item = MagicMock()
+    selected_item.callspec.params = {
+        "filename": "a.json",
+        "scenario": selected_scenario,
+    }
+    seed_scenarios_for_items([selected_item, MagicMock(spec=[])])
+    seed_scenarios_for_items([selected_item])
+
+    mock_insert.assert_called_once()
+    assert list(mock_insert.call_args.args[0]) == [selected_scenario]
+
+
+# ---------------------------------------------------------------------------
+# 7. scenario_manifest.py — manifest index
+# ---------------------------------------------------------------------------
+
+
+def test_scenario_manifest_refreshes_only_changed_files(tmp_path):
+    """Unchanged files are served from the index; selectors match name, NHS number or file."""
+    data_dir = tmp_path / "scenarios"
+    data_dir.mkdir()
+    (data_dir / "a.json").write_text(
+        '{"scenario_name": "RSV - eligible", "data": [{"NHS_NUMBER": "9000000001"}]}',
+        encoding="utf-8",
+    )
+    (data_dir / "b.json").write_text(
+        '{"scenario_name": "FLU - not eligible", "config_filenames": ["FLU.json"], '
+        '"data": [{"NHS_NUMBER": "9000000002"}]}',
+        encoding="utf-8",
+    )
+    manifest_dir = tmp_path / "manifests"
+
+    manifest = load_scenario_manifest(data_dir, manifest_dir)
+    assert manifest["b.json"]["config_filenames"] == ["FLU.json"]
+
+    (data_dir / "a.json").write_text(
+        '{"scenario_name": "RSV - changed", "data": []}', encoding="utf-8"
+    )
+    with patch(
+        "utils.scenario_manifest._summarise_scenario",
+        wraps=scenario_manifest._summarise_scenario,
+    ) as mock_summarise:
+        manifest = load_scenario_manifest(data_dir, manifest_dir)
+
+    assert [call.args[0].name for call in mock_summarise.call_args_list] == ["a.json"]
+    assert manifest["a.json"]["scenario_name"] == "RSV - changed"
+    assert select_scenario_files(manifest, ["9000000002"]) == ["b.json"]
+    assert select_scenario_files(manifest, ["rsv"]) == ["a.json"]
+    assert select_scenario_files(manifest, ["*.json"]) == ["a.json", "b.json"]
+
+
+# ---------------------------------------------------------------------------
+# 8. json_codec.py — codec layer
+# ---------------------------------------------------------------------------
+
+
+def test_json_codec_round_trips_and_raises_stdlib_decode_error():
+    """Either backend raises json.JSONDecodeError and pretty-prints like json.dumps(indent=2)."""
+    document = {"b": [1, {"c": None}], "a": "x"}
+
+    assert json_codec.loads(json_codec.dumps(document)) == document
+    assert json_codec.dumps(document, indent=True) == json.dumps(document, indent=2)
+    with pytest.raises(json.JSONDecodeError):
+        json_codec.loads("{ bad json", site="unit_test")
+    assert json_codec.codec_timings()["unit_test"]["calls"] == 1
+
+
+# ---------------------------------------------------------------------------
+# 9. data_helper.py — incremental DynamoDB preload
+# ---------------------------------------------------------------------------
+
+
+@patch("utils.data_helper.get_dynamo_helper")
+def test_preload_writes_only_changed_items_and_deletes_removed_keys(
+    mock_get_helper, tmp_path, monkeypatch
+):
+    """A second sync skips unchanged items; an emptied table forces a full reseed."""
+    monkeypatch.delenv("DYNAMO_FULL_RESEED", raising=False)
+    monkeypatch.setattr(
+        data_helper,
+        "seed_manifest_path",
+        lambda environment, table_name: tmp_path / f"{environment}-{table_name}.json",
+    )
+    helper = mock_get_helper.return_value
+    helper.environment, helper.table_name = "dev", "table"
+    helper.table_identity.return_value = "2026-01-01/"
+
+    person = {"NHS_NUMBER": "1", "ATTRIBUTE_TYPE": "PERSON", "AGE": "70"}
+    cohorts = {"NHS_NUMBER": "1", "ATTRIBUTE_TYPE": "COHORTS"}
+    data_helper._sync_dynamo_items([person, cohorts])
+    helper.insert_items.assert_called_once_with([person, cohorts])
+
+    helper.reset_mock()
+    changed = dict(person, AGE="71")
+    data_helper._sync_dynamo_items([changed])
+    helper.insert_items.assert_called_once_with([changed])
+    helper.delete_items.assert_called_once_with(
+        [{"NHS_NUMBER": "1", "ATTRIBUTE_TYPE": "COHORTS"}]
+    )
+
+    helper.reset_mock()
+    data_helper._sync_dynamo_items([changed])
+    helper.insert_items.assert_not_called()
+    helper.delete_items.assert_not_called()
+
+    helper.reset_mock()
+    helper.table_identity.return_value = "2026-01-01/generation-2"
+    data_helper._sync_dynamo_items([changed])
+    helper.insert_items.assert_called_once_with([changed])
+
+
+# ---------------------------------------------------------------------------
+# 10. hashing_engine.py — NhsNumberHasher
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("parallel_threshold", [1_000, 2])
+def test_hasher_matches_hmac_and_only_copies_hashed_items(parallel_threshold):
+    """In-process and process-pool hashing give the API's HMAC; inputs are untouched."""
+    secret = b"secret"
+    cohorts = {
+        "ATTRIBUTE_TYPE": "COHORTS",
+        "COHORT_MEMBERSHIPS": [{"COHORT_LABEL": "x"}],
+    }
+    items = [
+        {"NHS_NUMBER": 9000000001, "ATTRIBUTE_TYPE": "PERSON"},
+        {"NHS_NUMBER": "9000000002", "ATTRIBUTE_TYPE": "PERSON"},
+        dict(cohorts, NHS_NUMBER="9000000001"),
+        {"ATTRIBUTE_TYPE": "NO_NHS_NUMBER"},
+    ]
+    hasher = NhsNumberHasher(parallel_threshold=parallel_threshold)
+
+    hashed = hasher.hash_items(items, secret)
+
+    expected = hmac.new(secret, b"9000000001", hashlib.sha512).hexdigest()
+    assert hashed[0]["NHS_NUMBER"] == hashed[2]["NHS_NUMBER"] == expected
+    assert items[0]["NHS_NUMBER"] == 9000000001
+    assert hashed[2]["COHORT_MEMBERSHIPS"] is items[2]["COHORT_MEMBERSHIPS"]
+    assert hashed[3] is items[3]
+    assert hasher.hash("9000000002", b"other") != hashed[1]["NHS_NUMBER"]
+
+
+def test_hasher_memo_stays_bounded_when_precomputing(monkeypatch):
+    monkeypatch.setattr(hashing_engine, "_MAX_MEMOIZED_DIGESTS", 10)
+    secret = b"secret"
+    hasher = NhsNumberHasher()
+
+    hasher.precompute([str(i) for i in range(8)], secret)
+    hasher.precompute([str(i) for i in range(100, 125)], secret)
+
+    assert len(hasher._digests) == 10
+    expected = hmac.new(secret, b"124", hashlib.sha512).hexdigest()
+    assert hasher.hash("124", secret) == expected
+    assert len(hasher._digests) <= 10
+
+
+def test_hasher_hashes_serialized_items_to_string_attribute_values():
+    secret = b"secret"
+    items = [
+        {"NHS_NUMBER": {"N": "9000000001"}, "ATTRIBUTE_TYPE": {"S": "PERSON"}},
+        {"ATTRIBUTE_TYPE": {"S": "NO_NHS_NUMBER"}},
+    ]
+
+    hashed = NhsNumberHasher().hash_items(items, secret, serialized=True)
+
+    expected = hmac.new(secret, b"9000000001", hashlib.sha512).hexdigest()
+    assert hashed[0] == {
+        "NHS_NUMBER": {"S": expected},
+        "ATTRIBUTE_TYPE": {"S": "PERSON"},
+    }
+    assert hashed[1] is items[1]
+
+
+# ---------------------------------------------------------------------------
+# 11. seed_pipeline.py — streaming seed pipeline
+# ---------------------------------------------------------------------------
+
+
+def test_seed_pipeline_streams_unique_batches_and_surfaces_write_errors():
+    """Items are produced lazily, deduplicated and written in order; write errors stop the run."""
+    produced = []
+
+    def generate():
+        for i in range(10):
+            produced.append(i)
+            yield {"NHS_NUMBER": str(i % 7), "ATTRIBUTE_TYPE": "PERSON", "i": i}
+
+    written = []
+    count = write_batches_in_background(
+        iter_batches(iter_unique_items(generate()), size=2),
+        written.append,
+        max_queued=1,
+    )
+
+    assert count == 7
+    assert [item["i"] for batch in written for item in batch] == list(range(7))
+    assert len(produced) == 10
+
+    def failing_write(batch):
+        raise RuntimeError("throttled")
+
+    produced.clear()
+    with pytest.raises(RuntimeError, match="throttled"):
+        write_batches_in_background(
+            iter_batches(generate(), size=1), failing_write, max_queued=1
+        )
+    assert len(produced) < 10
+
+
+# ---------------------------------------------------------------------------
+# 12. config_scheduler.py / config_coresidency.py — ordering tests by S3 configs
+# ---------------------------------------------------------------------------
+
+
+def test_config_scheduler_groups_scenarios_without_crossing_other_tests():
+    """Tests are grouped by config set per module; tests without a scenario stay put."""
+    story = MagicMock(config_path="story")
+    errors = MagicMock(config_path=None)
+
+    def item(name, module, config_filenames=None):
+        test_item = MagicMock(module=module, stash={})
+        test_item.name = name
+        if config_filenames is None:
+            test_item.callspec = None
+        else:
+            test_item.callspec.params = {
+                "scenario": {"config_filenames": config_filenames}
+            }
+        return test_item
+
+    items = [
+        item("a1", story, ["a.json"]),
+        item("b1", story, ["b.json", "c.json"]),
+        item("a2", story, ["a.json"]),
+        item("b2", story, ["c.json", "b.json"]),
+        item("no_config", errors),
+        item("a3", story, ["a.json"]),
+        item("b3", story, ["b.json", "c.json"]),
+        item("a4", story, ["a.json"]),
+    ]
+
+    grouped = group_by_config_set(items)
+
+    assert [test_item.name for test_item in grouped] == [
+        "a1",
+        "a2",
+        "b1",
+        "b2",
+        "no_config",
+        "a3",
+        "a4",
+        "b3",
+    ]
+    assert (count_config_switches(items), count_config_switches(grouped)) == (7, 4)
+
+
+def test_coresidency_planner_only_merges_config_sets_that_cannot_see_each_other(
+    tmp_path,
+):
+    for name, campaign_id, target, iteration_id in [
+        ("rsv.json", "A", "RSV", "1"),
+        ("covid.json", "B", "COVID", "2"),
+        ("rsv_again.json", "A", "RSV", "3"),
+        ("other_consumer.json", "D", "RSV", "4"),
+        # <<RANDOM_GUID>> passes through unresolved, so both upload one ID
+        ("guid_a.json", "E", "RSV", ",<<RANDOM_GUID>>"),
+        ("guid_b.json", "F", "COVID", ",<<RANDOM_GUID>>"),
+    ]:
+        (tmp_path / name).write_text(
+            json.dumps(
+                {
+                    "CampaignConfig": {
+                        "ID": campaign_id,
+                        "Target": target,
+                        "Iterations": [{"ID": iteration_id}],
+                    }
+                }
+            )
+        )
+    consumer_campaigns = {
+        "X": frozenset({"A", "B"}),
+        "Y": frozenset({"D"}),
+        "Z": frozenset({"E"}),
+        "W": frozenset({"F"}),
+    }
+
+    def scenario(consumer, conditions=None):
+        return {
+            "request_headers": {"NHSE-Product-ID": consumer},
+            "query_params": {"conditions": conditions} if conditions else None,
+        }
+
+    units = [
+        (frozenset({"rsv.json"}), [scenario("X", "rsv")]),
+        (frozenset({"covid.json"}), [scenario("X", "COVID")]),
+        # Same campaign ID as rsv.json
+        (frozenset({"rsv_again.json"}), [scenario("X", "rsv")]),
+        (frozenset({"other_consumer.json"}), [scenario("Y")]),
+        (frozenset({"missing.json"}), [scenario("Y")]),
+    ]
+
+    assert plan_coresident_groups(units, tmp_path, consumer_campaigns) == [
+        [0, 1, 3],
+        [2],
+        [4],
+    ]
+    # Asking for every condition makes covid.json visible to the rsv scenarios
+    units[0][1].append(scenario("X", "ALL"))
+    assert plan_coresident_groups(units, tmp_path, consumer_campaigns)[0] == [0, 3]
+
+    # Invisible to each other, but sharing an iteration ID once resolved
+    guid_units = [
+        (frozenset({"guid_a.json"}), [scenario("Z")]),
+        (frozenset({"guid_b.json"}), [scenario("W")]),
+    ]
+    assert plan_coresident_groups(guid_units, tmp_path, consumer_campaigns) == [
+        [0],
+        [1],
+    ]
+
+
+# ---------------------------------------------------------------------------
+# 13. data_template_resolver.py — TemplateEngine
+# ---------------------------------------------------------------------------
+
+
+def test_template_engine_results_can_be_mutated_without_touching_templates():
+    """Changing build() or apply() output never leaks into later scenarios."""
+    templates = [
+        {"ATTRIBUTE_TYPE": "VACCINE_BASE", "BOOKINGS": [{"DATE": "1"}]},
+        {"ATTRIBUTE_TYPE": "COHORTS", "COHORT_MEMBERSHIPS": [{"LABEL": "a"}]},
+    ]
+    engine = TemplateEngine(templates, {"RSV": "VACCINE_BASE"})
+
+    built = {item["ATTRIBUTE_TYPE"]: item for item in engine.build()}
+    built["RSV"]["BOOKINGS"].append({"DATE": "2"})
+    built["COHORTS"]["COHORT_MEMBERSHIPS"][0]["LABEL"] = "changed"
+    (applied,) = engine.apply([{"ATTRIBUTE_TYPE": "COHORTS"}])
+    applied["COHORT_MEMBERSHIPS"].clear()
+
+    assert templates[0]["BOOKINGS"] == [{"DATE": "1"}]
+    assert engine.apply([{"ATTRIBUTE_TYPE": "RSV"}])[0]["BOOKINGS"] == [{"DATE": "1"}]
+    assert engine.apply([{"ATTRIBUTE_TYPE": "COHORTS"}])[0]["COHORT_MEMBERSHIPS"] == [
+        {"LABEL": "a"}
+    ]
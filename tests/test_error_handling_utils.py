@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 from botocore.exceptions import ClientError
 
+from utils import data_helper
 from utils.data_helper import load_all_expected_responses, load_all_test_scenarios
 from utils.dynamo_helper import file_backup_exists
 from utils.eligibility_api_client import EligibilityApiClient
@@ -61,6 +62,30 @@ def test_load_all_test_scenarios_skips_bad_json(tmp_path):
     assert result == {}
 
 
+def test_seeding_items_dynamo_cannot_store_fails_naming_the_scenario(tmp_path):
+    """A float loads (nothing is serialized yet) but fails loudly once seeded."""
+    (tmp_path / "float.json").write_text(
+        '{"scenario_name": "Float score", "data": [{"NHS_NUMBER": "1", "SCORE": 1.5}]}',
+        encoding="utf-8",
+    )
+
+    mock_engine = MagicMock()
+    mock_engine.apply.side_effect = lambda data: data
+
+    with patch("utils.data_helper.TemplateEngine.create", return_value=mock_engine):
+        result = load_all_test_scenarios(tmp_path, use_cache=False)
+
+    assert list(result) == ["float.json"]
+    with pytest.raises(TypeError, match="Float score"):
+        list(
+            data_helper._iter_dynamo_items(
+                result.values(),
+                {"AWSCURRENT": None, "AWSPREVIOUS": None},
+                serialized=True,
+            )
+        )
+
+
 # ---------------------------------------------------------------------------
 # 3. dynamo_helper.py — file_backup_exists
 # ---------------------------------------------------------------------------
@@ -81,7 +106,7 @@ def test_file_backup_exists_catches_json_decode_error(mock_load_from_file):
 
 
 @patch.dict(os.environ, {"BASE_URL": "http://localhost"}, clear=True)
-@patch("utils.eligibility_api_client.boto3.client")
+@patch("utils.eligibility_api_client.get_client")
 def test_api_client_handles_ssm_client_error(mock_boto_client):
     """A boto3 ClientError from SSM is wrapped in a descriptive RuntimeError."""
     mock_ssm = MagicMock()
@@ -0,0 +1,7 @@
+"""Saves the seeded DynamoDB table to a local snapshot for restore-db."""
+
+from utils.dynamo_helper import export_dynamo_snapshot
+
+
+def test_export_db():
+    export_dynamo_snapshot()
@@ -3,13 +3,11 @@ import http
 import pytest
 
 from tests import test_config
-from utils.data_helper import initialise_tests, load_all_expected_responses
+from utils.data_helper import ExpectedResponseStore, initialise_tests
 
 # Update the below with the configuration values specified in test_config.py
 all_data = initialise_tests(test_config.NBS_INTEGRATION_TEST_DATA)
-all_expected_responses = load_all_expected_responses(
-    test_config.NBS_INTEGRATION_RESPONSES
-)
+all_expected_responses = ExpectedResponseStore(test_config.NBS_INTEGRATION_RESPONSES)
 config_path = test_config.NBS_INTEGRATION_CONFIGS
 
 param_list = list(all_data.items())
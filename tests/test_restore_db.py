@@ -0,0 +1,7 @@
+"""Rebuilds the DynamoDB table from the snapshot saved by snapshot-db."""
+
+from utils.dynamo_helper import restore_dynamo_snapshot
+
+
+def test_restore_db():
+    restore_dynamo_snapshot()
@@ -0,0 +1,11 @@
+"""Streams the performance test data into DynamoDB without holding it in memory.
+
+For datasets too large for preload_data, e.g. generated load-test data.
+"""
+
+from tests import test_config
+from utils.data_helper import stream_dynamo_data
+
+
+def test_stream_dynamo_data():
+    stream_dynamo_data([test_config.PERFORMANCE_TEST_DATA])
@@ -0,0 +1,122 @@
+"""Process-wide registry of boto3 clients and resources.
+
+Creating a client loads service models and resolves credentials, which is
+slow enough to matter when helpers do it per call. Clients are created once
+per (service, region, endpoint), with a connection pool large enough for
+the parallel writers and adaptive retries, and then shared. boto3 clients
+are thread-safe; resources are not, so each thread gets its own.
+
+Creations are counted so log_client_creations() shows the startup cost.
+"""
+
+import logging
+import os
+import threading
+from collections import Counter
+
+import boto3
+from botocore.config import Config
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_POOL_CONNECTIONS = 50
+_MAX_ATTEMPTS = 10
+
+_lock = threading.Lock()
+_session: boto3.session.Session | None = None
+_clients: dict[tuple, object] = {}
+_thread_resources = threading.local()
+# Bumped by reset_clients so every thread drops its resources too
+_generation = 0
+_creations: Counter = Counter()
+
+
+def max_pool_connections() -> int:
+    """Connections per client, overridable with AWS_MAX_POOL_CONNECTIONS."""
+    return int(os.getenv("AWS_MAX_POOL_CONNECTIONS", _DEFAULT_MAX_POOL_CONNECTIONS))
+
+
+def _client_config() -> Config:
+    return Config(
+        max_pool_connections=max_pool_connections(),
+        retries={"max_attempts": _MAX_ATTEMPTS, "mode": "adaptive"},
+    )
+
+
+def _get_session() -> boto3.session.Session:
+    # Sessions are not thread-safe, so callers must hold _lock
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
+
+
+def get_credentials():
+    """Return the shared session's credentials, or None if there are none."""
+    with _lock:
+        return _get_session().get_credentials()
+
+
+def get_client(service: str, region_name: str | None = None, endpoint_url=None):
+    """Return the shared client for a service, creating it on first use."""
+    key = (service, region_name, endpoint_url)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _get_session().client(
+                    service,
+                    region_name=region_name,
+                    endpoint_url=endpoint_url,
+                    config=_client_config(),
+                )
+                _clients[key] = client
+                _creations[f"client:{service}"] += 1
+    return client
+
+
+def get_resource(service: str, region_name: str | None = None, endpoint_url=None):
+    """Return this thread's resource for a service, creating it on first use."""
+    if getattr(_thread_resources, "generation", None) != _generation:
+        _thread_resources.generation = _generation
+        _thread_resources.resources = {}
+    resources = _thread_resources.resources
+
+    key = (service, region_name, endpoint_url)
+    resource = resources.get(key)
+    if resource is None:
+        with _lock:
+            resource = _get_session().resource(
+                service,
+                region_name=region_name,
+                endpoint_url=endpoint_url,
+                config=_client_config(),
+            )
+            _creations[f"resource:{service}"] += 1
+        resources[key] = resource
+    return resource
+
+
+def client_creations() -> dict[str, int]:
+    with _lock:
+        return dict(_creations)
+
+
+def log_client_creations() -> None:
+    creations = client_creations()
+    if creations:
+        logger.info(
+            "AWS clients created: %s",
+            ", ".join(f"{name}={count}" for name, count in sorted(creations.items())),
+        )
+
+
+def reset_clients() -> None:
+    """Drop every cached client, e.g. after credentials change."""
+    global _session, _generation
+    with _lock:
+        _session = None
+        _generation += 1
+        _clients.clear()
+        _creations.clear()
@@ -0,0 +1,184 @@
+"""Which S3 config sets can sit in the rules bucket at the same time.
+
+Each data-driven test uploads only its own configs, so the bucket is
+resynced whenever consecutive tests use different sets. Two sets can share
+the bucket when neither changes what the other's scenarios see:
+
+- no two configs share a campaign ID or iteration ID, as the API treats
+  those as one campaign;
+- no config from one set is visible to a scenario of the other. A campaign
+  is visible to a scenario when the consumer mapping lists it for the
+  scenario's NHSE-Product-ID and its Target passes the scenario's
+  ``conditions`` filter.
+
+plan_coresident_groups merges compatible sets greedily, so each group can be
+uploaded once and all of its scenarios run against it.
+"""
+
+import json
+import logging
+from functools import lru_cache
+from pathlib import Path
+
+from utils import json_codec
+from utils.placeholder_utils import resolve_placeholders
+
+logger = logging.getLogger(__name__)
+
+_ALL_CONDITIONS = "ALL"
+
+
+@lru_cache(maxsize=None)
+def read_campaign(path: str) -> dict | None:
+    """Return a config's campaign ID, iteration IDs and Target.
+
+    Iteration IDs are compared as they are uploaded, after placeholder
+    resolution, so configs whose placeholders resolve to the same ID
+    conflict. Returns None if the config cannot be read, so callers can
+    treat it as conflicting with everything.
+    """
+    try:
+        campaign = json_codec.load_file(path, site="config_load")["CampaignConfig"]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+        logger.warning("Unable to analyse config %s: %s", path, e)
+        return None
+
+    return {
+        "id": campaign.get("ID"),
+        "iteration_ids": frozenset(
+            resolve_placeholders(str(iteration["ID"]), Path(path).name)
+            for iteration in campaign.get("Iterations") or []
+            if iteration.get("ID")
+        ),
+        "target": str(campaign.get("Target", "")).upper(),
+    }
+
+
+@lru_cache(maxsize=None)
+def load_consumer_campaigns(mapping_path: str) -> dict[str, frozenset[str]]:
+    """Return the campaign config IDs mapped to each consumer (NHSE-Product-ID)."""
+    mapping = json_codec.load_file(mapping_path, site="config_load")
+    return {
+        consumer: frozenset(entry["CampaignConfigID"] for entry in campaigns)
+        for consumer, campaigns in mapping.items()
+    }
+
+
+def scenario_audience(scenario: dict) -> tuple[str | None, frozenset[str] | None]:
+    """Return the consumer a scenario calls as and the Targets it asks for.
+
+    The Targets are None when the scenario asks for every condition.
+    """
+    consumer = (scenario.get("request_headers") or {}).get("NHSE-Product-ID")
+    conditions = (scenario.get("query_params") or {}).get("conditions")
+    if not conditions:
+        return consumer, None
+    targets = frozenset(
+        condition.strip().upper()
+        for condition in str(conditions).split(",")
+        if condition.strip()
+    )
+    return consumer, None if _ALL_CONDITIONS in targets else targets
+
+
+def _visible(campaign: dict, audience, consumer_campaigns) -> bool:
+    consumer, targets = audience
+    # An unmapped consumer is assumed to see everything, to stay on the safe side
+    mapped = consumer_campaigns.get(consumer)
+    return (mapped is None or campaign["id"] in mapped) and (
+        targets is None or campaign["target"] in targets
+    )
+
+
+class _Group:
+    """Config sets planned to share the bucket, with what their scenarios see."""
+
+    def __init__(self, shareable: bool = True):
+        # False for sets with configs that could not be analysed
+        self.shareable = shareable
+        self.unit_indexes: list[int] = []
+        self.campaigns: dict[str, dict] = {}
+        self.audiences: set = set()
+
+    def accepts(self, campaigns: dict[str, dict], audiences: set, consumer_campaigns):
+        if not self.shareable:
+            return False
+        added = {
+            name: campaign
+            for name, campaign in campaigns.items()
+            if name not in self.campaigns
+        }
+        missing = {
+            name: campaign
+            for name, campaign in self.campaigns.items()
+            if name not in campaigns
+        }
+        for campaign in added.values():
+            for other in self.campaigns.values():
+                if (
+                    campaign["id"] == other["id"]
+                    or campaign["iteration_ids"] & other["iteration_ids"]
+                ):
+                    return False
+        return not any(
+            _visible(campaign, audience, consumer_campaigns)
+            for campaign in added.values()
+            for audience in self.audiences
+        ) and not any(
+            _visible(campaign, audience, consumer_campaigns)
+            for campaign in missing.values()
+            for audience in audiences
+        )
+
+    def add(self, index: int, campaigns: dict[str, dict], audiences: set) -> None:
+        self.unit_indexes.append(index)
+        self.campaigns.update(campaigns)
+        self.audiences |= audiences
+
+
+def plan_coresident_groups(
+    units: list[tuple[frozenset[str], list[dict]]],
+    config_path: str | Path,
+    consumer_campaigns: dict[str, frozenset[str]],
+) -> list[list[int]]:
+    """Group config sets whose configs can share the bucket.
+
+    Args:
+        units: Each config set, as its config filenames and the scenarios
+            that use it.
+        config_path: Directory holding the config files.
+        consumer_campaigns: From load_consumer_campaigns.
+
+    Returns:
+        Groups of indexes into ``units``. Each set joins the first group it
+        is compatible with, so groups keep the sets' order of appearance.
+    """
+    groups: list[_Group] = []
+    for index, (config_filenames, scenarios) in enumerate(units):
+        campaigns = {
+            name: read_campaign(str(Path(config_path) / name))
+            for name in config_filenames
+        }
+        audiences = {scenario_audience(scenario) for scenario in scenarios}
+
+        if not all(campaigns.values()):
+            # Unreadable configs cannot be checked, so share with nothing
+            group = _Group(shareable=False)
+            groups.append(group)
+            group.unit_indexes.append(index)
+            continue
+
+        group = next(
+            (
+                group
+                for group in groups
+                if group.accepts(campaigns, audiences, consumer_campaigns)
+            ),
+            None,
+        )
+        if group is None:
+            group = _Group()
+            groups.append(group)
+        group.add(index, campaigns, audiences)
+
+    return [group.unit_indexes for group in groups]
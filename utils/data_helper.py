@@ -1,18 +1,44 @@
 import json
 import logging
 import os
-from copy import deepcopy
+import time
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-import hmac
-import hashlib
 from typing import Optional
 
 from dotenv import load_dotenv
 
+from . import json_codec
 from .data_template_resolver import TemplateEngine
-from .dynamo_helper import insert_into_dynamo
-from .placeholder_utils import resolve_placeholders
+from .document_transformer import transform_document
+from .dynamo_helper import (
+    get_dynamo_helper,
+    insert_into_dynamo,
+    insert_serialized_into_dynamo,
+)
+from .dynamo_seed_manifest import (
+    full_reseed_requested,
+    key_to_dynamo_key,
+    load_seed_manifest,
+    plan_incremental_seed,
+    save_seed_manifest,
+    seed_manifest_path,
+)
+from .dynamo_serialization import serialize_item
+from .hashing_engine import get_nhs_number_hasher
+from .placeholder_utils import get_placeholder_resolver
+from .scenario_cache import ScenarioCache, scenario_cache_enabled
+from .scenario_manifest import load_scenario_manifest, select_scenario_files
 from .secrets_helper import SecretsManagerClient
+from .seed_pipeline import (
+    iter_batches,
+    iter_unique_items,
+    write_batches_in_background,
+)
 
 keys_to_ignore = ["responseId", "lastUpdated", "id"]
 load_dotenv()
@@ -20,79 +46,209 @@ AWS_REGION = "eu-west-2"
 logger = logging.getLogger(__name__)
 
 _DEFAULT_PRODUCT_ID = "test-Story_Test_Consumer_ID"
+_SLOWEST_SCENARIOS_TO_REPORT = 5
+_EXPECTED_RESPONSE_CACHE_SIZE = 128
+# Scenario files each loader worker may have in flight while streaming
+_STREAMED_SCENARIOS_PER_WORKER = 2
+
+_scenario_cache: "ScenarioCache | None" = None
+
+# Scenarios loaded by initialise_tests that have not been written to DynamoDB
+# yet, keyed by id() so they can be matched against selected test items.
+_pending_seed_scenarios: dict[int, dict] = {}
 
 
 def initialise_tests(folder):
+    """Load a suite's scenarios and plan, but do not perform, their seeding.
+
+    DynamoDB writes happen later in seed_scenarios_for_items, once pytest
+    knows which tests were selected.
+    """
     folder_path = Path(folder).resolve()
-    all_data = load_all_test_scenarios(folder_path)
+    all_data = load_all_test_scenarios(
+        folder_path, filenames=_selected_scenario_files(folder_path)
+    )
 
     # Skip DynamoDB insertion if data was preloaded in a dedicated step
     if os.getenv("DYNAMO_PRELOADED", "").lower() == "true":
         logger.info("Skipping DynamoDB insertion (data preloaded)")
         return all_data
 
-    _insert_scenarios_into_dynamo(all_data)
+    for scenario in all_data.values():
+        _pending_seed_scenarios[id(scenario)] = scenario
+    logger.debug(
+        "Planned DynamoDB seeding for %d scenarios from %s",
+        len(all_data),
+        folder_path.name,
+    )
 
     return all_data
 
 
-def _insert_scenarios_into_dynamo(all_data):
-    """Hash NHS numbers (if required) and insert all scenario data into DynamoDB."""
-    # Setup AWS Secrets
+def _selected_scenario_files(folder_path: Path) -> list[str] | None:
+    """Filenames matching SCENARIO_SELECTION, or None to load every file.
+
+    SCENARIO_SELECTION holds newline-separated selectors (see
+    select_scenario_files). They are matched against the folder's manifest
+    index, so only the chosen files are fully loaded.
+    """
+    selection = os.getenv("SCENARIO_SELECTION", "")
+    selectors = [selector for selector in selection.splitlines() if selector]
+    if not selectors:
+        return None
+
+    filenames = select_scenario_files(load_scenario_manifest(folder_path), selectors)
+    logger.info(
+        "Scenario selection matched %d files in %s", len(filenames), folder_path.name
+    )
+    return filenames
+
+
+def seed_scenarios(scenarios) -> None:
+    """Insert the given scenarios into DynamoDB if they are still pending.
+
+    Scenarios that were already seeded, or that were not loaded through
+    initialise_tests (e.g. because data was preloaded), are ignored.
+    """
+    to_seed = {}
+    for scenario in scenarios:
+        if _pending_seed_scenarios.pop(id(scenario), None) is not None:
+            to_seed[id(scenario)] = scenario
+
+    if not to_seed:
+        return
+
+    logger.info("Seeding DynamoDB with %d scenarios", len(to_seed))
+    _insert_scenarios_into_dynamo(to_seed.values())
+
+
+def seed_scenarios_for_items(items) -> None:
+    """Seed only the pending scenarios used by the selected pytest items.
+
+    Items are matched through their ``scenario`` parameter.
+    """
+    selected = []
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        scenario = callspec.params.get("scenario") if callspec else None
+        if isinstance(scenario, dict):
+            selected.append(scenario)
+
+    logger.info(
+        "%d of %d pending scenarios are used by selected tests",
+        sum(1 for scenario in selected if id(scenario) in _pending_seed_scenarios),
+        len(_pending_seed_scenarios),
+    )
+    seed_scenarios(selected)
+
+
+def _insert_scenarios_into_dynamo(scenarios):
+    """Hash NHS numbers (if required) and insert all scenario data into DynamoDB.
+
+    Items are streamed through hashing and dedup in batches, and written on a
+    background thread while later scenarios are still being prepared, so
+    ``scenarios`` may be any iterable, including a generator such as
+    iter_test_scenarios. Each item is serialized to AttributeValue form once,
+    here, and written through the low-level client.
+    """
+    secret_keys = _initialise_hashing_secrets()
+
+    logger.info("Encrypting NHS numbers (if required) and streaming items to Dynamo")
+    items = iter_unique_items(
+        _iter_dynamo_items(scenarios, secret_keys, serialized=True),
+        serialized=True,
+    )
+    written = write_batches_in_background(
+        iter_batches(items), insert_serialized_into_dynamo
+    )
+    logger.info("Data Added to Dynamo (%d items)", written)
+
+
+def _prepare_dynamo_items(all_data) -> list[dict]:
+    """Hash NHS numbers (if required) and return the unique DynamoDB items."""
+    secret_keys = _initialise_hashing_secrets()
+    scenarios = list(all_data.values())
+
+    # Hash each distinct NHS number once per secret up front, so large
+    # datasets can be spread across processes
+    nhs_numbers_by_secret = {}
+    for scenario in scenarios:
+        hashed, secret = _scenario_hashing_secret(scenario, secret_keys)
+        if hashed:
+            nhs_numbers_by_secret.setdefault(secret, set()).update(
+                str(item["NHS_NUMBER"])
+                for item in scenario["dynamo_items"]
+                if "NHS_NUMBER" in item
+            )
+    hasher = get_nhs_number_hasher()
+    for secret, nhs_numbers in nhs_numbers_by_secret.items():
+        hasher.precompute(nhs_numbers, secret)
+
+    logger.info("Encrypting NHS numbers (if required) and preparing DynamoDB items")
+    return list(iter_unique_items(_iter_dynamo_items(scenarios, secret_keys)))
+
+
+def _initialise_hashing_secrets() -> dict[str, bytes]:
     secrets_manager = SecretsManagerClient(AWS_REGION)
-    secret_keys = secrets_manager.initialise_secret_keys(
+    return secrets_manager.initialise_secret_keys(
         f"eligibility-signposting-api-{os.getenv('ENVIRONMENT')}/hashing_secret"
     )
 
-    all_items = []
 
-    logger.info("Encrypting NHS numbers (if required) and preparing DynamoDB items")
-    for scenario in all_data.values():
-        # get the scenario data items to be stored in dynamo
-        dynamo_items = scenario["dynamo_items"]
-        # get the hashing version to be used in the scenario
-        scenario_secret_version = scenario["secret_version"]
-
-        # Case 1: No secrets exist OR user explicitly requests PLAINTEXT
-        if (
-            not secret_keys["AWSCURRENT"] and not secret_keys["AWSPREVIOUS"]
-        ) or scenario_secret_version == "PLAINTEXT":
-            items_to_insert = dynamo_items
-
-        # Case 2: Hash using AWSCURRENT / AWSPREVIOUS / None
-        elif scenario_secret_version in ("AWSCURRENT", "AWSPREVIOUS", None):
-            secret = _get_scenario_secret_for_hashing(
-                secret_keys, scenario_secret_version
-            )
-            items_to_insert = _encrypt_nhs_numbers(dynamo_items, secret)
+def _scenario_hashing_secret(scenario, secret_keys) -> tuple[bool, bytes | None]:
+    """Return whether a scenario's NHS numbers are hashed, and with which secret."""
+    # get the hashing version to be used in the scenario
+    scenario_secret_version = scenario["secret_version"]
 
-        # Case 3: Unknown secret version
-        else:
-            raise ValueError(f"Unknown secret_version: {scenario_secret_version}")
-
-        all_items.extend(items_to_insert)
-
-    # Deduplicate items with the same (NHS_NUMBER, ATTRIBUTE_TYPE) key.
-    # Some test scenarios share identical DynamoDB data (e.g. same patient,
-    # different S3 configs) and batch_writer rejects duplicate keys in a batch.
-    seen_keys = set()
-    unique_items = []
-    for item in all_items:
-        key = (str(item.get("NHS_NUMBER", "")), str(item.get("ATTRIBUTE_TYPE", "")))
-        if key not in seen_keys:
-            seen_keys.add(key)
-            unique_items.append(item)
-
-    if len(unique_items) < len(all_items):
-        logger.info(
-            "Deduplicated %d → %d items (removed %d duplicates)",
-            len(all_items),
-            len(unique_items),
-            len(all_items) - len(unique_items),
+    # Case 1: No secrets exist OR user explicitly requests PLAINTEXT
+    if (
+        not secret_keys["AWSCURRENT"] and not secret_keys["AWSPREVIOUS"]
+    ) or scenario_secret_version == "PLAINTEXT":
+        return False, None
+
+    # Case 2: Hash using AWSCURRENT / AWSPREVIOUS / None
+    if scenario_secret_version in ("AWSCURRENT", "AWSPREVIOUS", None):
+        return True, _get_scenario_secret_for_hashing(
+            secret_keys, scenario_secret_version
         )
 
-    insert_into_dynamo(unique_items)
-    logger.info("Data Added to Dynamo")
+    # Case 3: Unknown secret version
+    raise ValueError(f"Unknown secret_version: {scenario_secret_version}")
+
+
+def _iter_dynamo_items(scenarios, secret_keys, serialized: bool = False):
+    """Yield every scenario's DynamoDB items, with NHS numbers hashed as required.
+
+    With ``serialized`` the items are yielded in AttributeValue form.
+    """
+    for scenario in scenarios:
+        # get the scenario data items to be stored in dynamo
+        if serialized:
+            dynamo_items = _serialized_dynamo_items(scenario)
+        else:
+            dynamo_items = scenario["dynamo_items"]
+        hashed, secret = _scenario_hashing_secret(scenario, secret_keys)
+        if hashed:
+            dynamo_items = _encrypt_nhs_numbers(dynamo_items, secret, serialized)
+        yield from dynamo_items
+
+
+def _serialized_dynamo_items(scenario) -> list[dict]:
+    """Return a scenario's items in AttributeValue form.
+
+    Serialized only when seeding, so loads that seed nothing never pay for it.
+
+    Raises:
+        TypeError: If an item holds a value DynamoDB cannot store, e.g. a
+            float; the message names the scenario.
+    """
+    try:
+        return [serialize_item(item) for item in scenario["dynamo_items"]]
+    except TypeError as e:
+        raise TypeError(
+            f"Cannot serialize DynamoDB items for scenario "
+            f"{scenario.get('scenario_name')!r}: {e}"
+        ) from e
 
 
 def preload_all_dynamo_data(folders):
@@ -110,35 +266,102 @@ def preload_all_dynamo_data(folders):
         combined_data.update(all_data)
 
     logger.info("Preloading %d scenarios into DynamoDB", len(combined_data))
-    _insert_scenarios_into_dynamo(combined_data)
+    _sync_dynamo_items(_prepare_dynamo_items(combined_data))
 
 
-def resolve_placeholders_in_data(data, file_name):
-    if isinstance(data, dict):
-        return {k: resolve_placeholders_in_data(v, file_name) for k, v in data.items()}
-    if isinstance(data, list):
-        return [resolve_placeholders_in_data(item, file_name) for item in data]
-    return resolve_placeholders(data, file_name)
+def stream_dynamo_data(folders):
+    """Load the scenarios in ``folders`` and write their items as they load.
+
+    Unlike preload_all_dynamo_data no stage holds the whole dataset: items
+    flow from the loader through templating, hashing and dedup to the
+    writer, so memory stays flat for datasets of any size. No seed manifest
+    is kept, so every item is written.
+    """
+    _insert_scenarios_into_dynamo(
+        scenario
+        for folder in folders
+        for _, scenario in iter_test_scenarios(Path(folder).resolve())
+    )
+
+
+def _sync_dynamo_items(items: list[dict]) -> None:
+    """Bring the table in line with ``items``, writing only what changed.
+
+    The keys and digests written are recorded in a per environment and table
+    seed manifest. Items whose digest matches the last run are skipped and
+    keys that are no longer present are deleted. Everything is rewritten if
+    there is no manifest, the table was recreated or truncated since it was
+    written, or
+    DYNAMO_FULL_RESEED=true. Finally every key is read back, waiting up to
+    DYNAMO_READINESS_TIMEOUT seconds (0 to skip) for it to become visible.
+    """
+    dynamo_helper = get_dynamo_helper()
+    manifest_path = seed_manifest_path(
+        dynamo_helper.environment, dynamo_helper.table_name
+    )
+    table_identity = dynamo_helper.table_identity()
+
+    previous = None
+    if full_reseed_requested():
+        logger.info("Full DynamoDB reseed requested")
+    else:
+        previous = load_seed_manifest(manifest_path, table_identity)
+        if previous is None:
+            logger.info("No usable seed manifest, reseeding DynamoDB in full")
+
+    to_write, to_delete, digests = plan_incremental_seed(items, previous)
+
+    if to_write:
+        dynamo_helper.insert_items(to_write)
+    if to_delete:
+        dynamo_helper.delete_items([key_to_dynamo_key(key) for key in to_delete])
+    save_seed_manifest(manifest_path, table_identity, digests)
+
+    logger.info(
+        "DynamoDB preload: %d items, wrote %d, deleted %d, skipped %d unchanged",
+        len(items),
+        len(to_write),
+        len(to_delete),
+        len(items) - len(to_write),
+    )
+
+    # Confirm the data is readable before any test sends a request for it
+    readiness_timeout = float(os.getenv("DYNAMO_READINESS_TIMEOUT", "60"))
+    if readiness_timeout > 0:
+        dynamo_helper.wait_for_items(items, readiness_timeout)
+
+
+def resolve_placeholders_in_data(data, file_name, resolver=None):
+    resolved_data, _ = transform_document(
+        data, file_name, resolver=resolver or get_placeholder_resolver()
+    )
+    return resolved_data
 
 
 def extract_nhs_number_from_data(data):
-    def find_nhs(obj):
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                if k.lower().replace("_", "") == "nhsnumber":
-                    return v
-                if isinstance(v, (dict, list)):
-                    result = find_nhs(v)
-                    if result:
-                        return result
-        elif isinstance(obj, list):
-            for item in obj:
-                result = find_nhs(item)
-                if result:
-                    return result
+    _, nhs_number = transform_document(data, capture_nhs_number=True)
+    return nhs_number or "UNKNOWN"
+
+
+def _load_expected_response(path: Path) -> dict | None:
+    """Read, resolve and mask one expected response file; None if unreadable."""
+    try:
+        raw_json = json_codec.load_file(path, site="expected_response")
+    except (OSError, IOError) as e:
+        logger.error("Failed to read expected response file %s: %s", path, e)
+        return None
+    except json.JSONDecodeError as e:
+        logger.error("Invalid JSON in expected response file %s: %s", path, e)
         return None
 
-    return find_nhs(data) or "UNKNOWN"
+    # Resolve placeholders and mask volatile fields in one pass
+    cleaned_data, _ = transform_document(
+        raw_json,
+        path.name,
+        resolver=get_placeholder_resolver(),
+        mask_keys=keys_to_ignore,
+    )
+    return {"response_items": cleaned_data}
 
 
 def load_all_expected_responses(folder_path):
@@ -148,22 +371,58 @@ def load_all_expected_responses(folder_path):
         if path.suffix != ".json":
             continue
 
-        try:
-            with path.open() as f:
-                raw_json = json.load(f)
-        except (OSError, IOError) as e:
-            logger.error("Failed to read expected response file %s: %s", path, e)
-            continue
-        except json.JSONDecodeError as e:
-            logger.error("Invalid JSON in expected response file %s: %s", path, e)
-            continue
+        expected_response = _load_expected_response(path)
+        if expected_response is not None:
+            all_data[path.name] = expected_response
 
-        resolved_data = resolve_placeholders_in_data(raw_json, path.name)
-        cleaned_data = clean_responses(data=resolved_data, ignore_keys=keys_to_ignore)
+    return all_data
 
-        all_data[path.name] = {"response_items": cleaned_data}
 
-    return all_data
+class ExpectedResponseStore(Mapping):
+    """Lazy, read-only view of the expected responses in a folder.
+
+    Behaves like the dict returned by load_all_expected_responses, but a file
+    is only parsed and resolved the first time a test asks for it. Parsed
+    responses are kept in a bounded LRU cache, so collection time and memory
+    scale with the tests that actually run.
+    """
+
+    def __init__(self, folder_path, max_cached: int = _EXPECTED_RESPONSE_CACHE_SIZE):
+        self.folder_path = Path(folder_path)
+        self._filenames: frozenset[str] | None = None
+        self._load = lru_cache(maxsize=max_cached)(self._load_by_name)
+
+    def _names(self) -> frozenset[str]:
+        if self._filenames is None:
+            try:
+                self._filenames = frozenset(
+                    path.name
+                    for path in self.folder_path.iterdir()
+                    if path.suffix == ".json"
+                )
+            except FileNotFoundError:
+                logger.warning(
+                    "Expected response folder not found: %s", self.folder_path
+                )
+                self._filenames = frozenset()
+        return self._filenames
+
+    def _load_by_name(self, filename: str) -> dict | None:
+        return _load_expected_response(self.folder_path / filename)
+
+    def __getitem__(self, filename: str) -> dict:
+        if filename not in self._names():
+            raise KeyError(filename)
+        expected_response = self._load(filename)
+        if expected_response is None:
+            raise KeyError(filename)
+        return expected_response
+
+    def __iter__(self):
+        return iter(sorted(self._names()))
+
+    def __len__(self) -> int:
+        return len(self._names())
 
 
 def _ensure_default_product_id(request_headers: dict, cached_test: bool) -> dict:
@@ -183,11 +442,11 @@ def _ensure_default_product_id(request_headers: dict, cached_test: bool) -> dict
     return request_headers
 
 
-def _build_test_scenario_entry(raw_json: dict, resolved_data) -> dict:
+def _build_test_scenario_entry(raw_json: dict, resolved_data, nhs_number) -> dict:
     """Construct the standard scenario dict from resolved template data."""
     return {
         "dynamo_items": resolved_data,
-        "nhs_number": extract_nhs_number_from_data(resolved_data),
+        "nhs_number": nhs_number or "UNKNOWN",
         "config_filenames": raw_json.get("config_filenames"),
         "expected_response_code": raw_json.get("expected_response_code"),
         "request_headers": raw_json.get("request_headers") or {},
@@ -201,8 +460,7 @@ def _process_single_scenario(
     path: Path, data_builder: TemplateEngine, cached_test: bool
 ) -> dict | None:
     try:
-        with path.open() as f:
-            raw_json = json.load(f)
+        raw_json = json_codec.load_file(path, site="scenario_load")
     except (OSError, IOError) as e:
         logger.error("Failed to read test scenario file %s: %s", path, e)
         return None
@@ -226,29 +484,233 @@ def _process_single_scenario(
         request_headers, cached_test
     )
 
-    resolved_data = resolve_placeholders_in_data(templated_data, path.name)
+    # Resolve placeholders and find the NHS number in one pass
+    resolved_data, nhs_number = transform_document(
+        templated_data,
+        path.name,
+        resolver=get_placeholder_resolver(),
+        capture_nhs_number=True,
+    )
+
+    return _build_test_scenario_entry(raw_json, resolved_data, nhs_number)
+
+
+def _timed_process_single_scenario(
+    path: Path, data_builder: TemplateEngine, cached_test: bool
+) -> tuple[dict | None, float]:
+    start = time.perf_counter()
+    scenario_result = _process_single_scenario(path, data_builder, cached_test)
+    return scenario_result, time.perf_counter() - start
+
+
+def _scenario_loader_workers() -> int:
+    """Worker count for scenario loading, overridable with SCENARIO_LOADER_WORKERS."""
+    configured = os.getenv("SCENARIO_LOADER_WORKERS", "")
+    if configured.isdigit() and int(configured) > 0:
+        return int(configured)
+    return min(8, os.cpu_count() or 1)
+
+
+def _create_scenario_executor(max_workers: int) -> Executor:
+    """Thread pool by default; SCENARIO_LOADER_EXECUTOR=process uses processes."""
+    if os.getenv("SCENARIO_LOADER_EXECUTOR", "thread").lower() == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def _log_scenario_timings(folder_path: Path, timings: dict[str, float]) -> None:
+    if not timings:
+        return
+
+    logger.info(
+        "Loaded %d scenario files from %s in %.3fs (summed per-file time)",
+        len(timings),
+        folder_path,
+        sum(timings.values()),
+    )
+    slowest = sorted(timings.items(), key=lambda t: t[1], reverse=True)
+    for filename, elapsed in slowest[:_SLOWEST_SCENARIOS_TO_REPORT]:
+        logger.debug("Scenario %s took %.3fs to load", filename, elapsed)
+
 
-    return _build_test_scenario_entry(raw_json, resolved_data)
+def _get_scenario_cache() -> ScenarioCache:
+    global _scenario_cache
+    if _scenario_cache is None:
+        _scenario_cache = ScenarioCache()
+    return _scenario_cache
 
 
-def load_all_test_scenarios(folder_path):
+def _lookup_cached_scenarios(
+    cache: ScenarioCache, paths: list[Path], cached_test: bool
+) -> tuple[dict[str, dict], dict[str, str | None]]:
+    """Return cached entries and the cache key computed for every path."""
+    cached_entries = {}
+    cache_keys = {}
+    for path in paths:
+        try:
+            key = cache.cache_key(path.read_bytes(), cached_test)
+        except OSError:
+            key = None
+        cache_keys[path.name] = key
+        entry = cache.get(path, key)
+        if entry is not None:
+            cached_entries[path.name] = entry
+    return cached_entries, cache_keys
+
+
+def load_all_test_scenarios(
+    folder_path,
+    max_workers: int | None = None,
+    use_cache: bool | None = None,
+    filenames: list[str] | None = None,
+):
+    """Load, template and resolve every scenario file in ``folder_path``.
+
+    Files are processed concurrently but results keep the alphabetical order
+    of their filenames. Files that fail to load are logged and skipped.
+    Resolved entries are read from and written to the on-disk scenario cache
+    unless ``use_cache`` (default: SCENARIO_CACHE) disables it. Passing
+    ``filenames`` restricts loading to those files.
+    """
     all_data = {}
 
     data_builder = TemplateEngine.create()
     cached_test = "performance" in folder_path.name.lower()
+    # Take the clock snapshot before fanning out so every worker resolves DATE
+    # tokens against it; TIME tokens still read the live clock by design
+    get_placeholder_resolver()
 
-    # Sort files alphabetically by filename
-    for path in sorted(Path(folder_path).iterdir(), key=lambda p: p.name.lower()):
-        if path.suffix != ".json":
-            continue
+    paths = _scenario_paths(folder_path, filenames)
 
-        scenario_result = _process_single_scenario(path, data_builder, cached_test)
+    use_cache = scenario_cache_enabled() if use_cache is None else use_cache
+    cache = _get_scenario_cache() if use_cache else None
+    cached_entries, cache_keys = {}, {}
+    if cache is not None:
+        cached_entries, cache_keys = _lookup_cached_scenarios(cache, paths, cached_test)
+
+    to_process = [path for path in paths if path.name not in cached_entries]
+    processed, timings = _process_scenarios(
+        to_process, data_builder, cached_test, max_workers
+    )
+
+    for path in paths:
+        scenario_result = cached_entries.get(path.name) or processed.get(path.name)
         if scenario_result is not None:
             all_data[path.name] = scenario_result
 
+    if cache is not None:
+        for filename, scenario_result in processed.items():
+            cache.put(folder_path / filename, cache_keys.get(filename), scenario_result)
+        logger.info(
+            "Scenario cache for %s: %d hits, %d misses",
+            folder_path.name,
+            len(cached_entries),
+            len(paths) - len(cached_entries),
+        )
+
+    _log_scenario_timings(folder_path, timings)
     return all_data
 
 
+def iter_test_scenarios(
+    folder_path, max_workers: int | None = None, filenames: list[str] | None = None
+):
+    """Yield ``(filename, scenario)`` for each scenario file as it is loaded.
+
+    Files are processed concurrently and come out in the same order as from
+    load_all_test_scenarios, but only a couple per worker are in flight and
+    nothing is kept or cached, so a folder of any size can be streamed.
+    Files that fail to load are logged and skipped. A missing folder yields
+    nothing.
+    """
+    folder_path = Path(folder_path)
+    if not folder_path.is_dir():
+        logger.info("Skipping missing folder: %s", folder_path)
+        return
+
+    data_builder = TemplateEngine.create()
+    cached_test = "performance" in folder_path.name.lower()
+    get_placeholder_resolver()
+
+    workers = max_workers or _scenario_loader_workers()
+    max_in_flight = workers * _STREAMED_SCENARIOS_PER_WORKER
+    in_flight = deque()
+    with _create_scenario_executor(workers) as executor:
+        for path in _scenario_paths(folder_path, filenames):
+            in_flight.append(
+                (
+                    path.name,
+                    executor.submit(
+                        _process_single_scenario, path, data_builder, cached_test
+                    ),
+                )
+            )
+            yield from _finished_scenarios(in_flight, max_in_flight - 1)
+        yield from _finished_scenarios(in_flight, 0)
+
+
+def _finished_scenarios(in_flight: deque, keep: int):
+    """Yield the oldest results until at most ``keep`` remain in flight."""
+    while len(in_flight) > keep:
+        filename, future = in_flight.popleft()
+        scenario_result = future.result()
+        if scenario_result is not None:
+            yield filename, scenario_result
+
+
+def _scenario_paths(folder_path: Path, filenames: list[str] | None) -> list[Path]:
+    # Sort files alphabetically by filename
+    return [
+        path
+        for path in sorted(Path(folder_path).iterdir(), key=lambda p: p.name.lower())
+        if path.suffix == ".json" and (filenames is None or path.name in filenames)
+    ]
+
+
+def _process_scenarios(
+    paths: list[Path],
+    data_builder: TemplateEngine,
+    cached_test: bool,
+    max_workers: int | None,
+) -> tuple[dict[str, dict], dict[str, float]]:
+    """Process scenario files, concurrently when worthwhile.
+
+    Returns the successful results and the per-file timings, both keyed by
+    filename.
+    """
+    workers = max_workers or _scenario_loader_workers()
+
+    if workers <= 1 or len(paths) <= 1:
+        results = map(
+            _timed_process_single_scenario,
+            paths,
+            repeat(data_builder),
+            repeat(cached_test),
+        )
+        return _collect_scenario_results(paths, results)
+
+    with _create_scenario_executor(workers) as executor:
+        results = executor.map(
+            _timed_process_single_scenario,
+            paths,
+            repeat(data_builder),
+            repeat(cached_test),
+        )
+        return _collect_scenario_results(paths, results)
+
+
+def _collect_scenario_results(
+    paths, results
+) -> tuple[dict[str, dict], dict[str, float]]:
+    processed = {}
+    timings = {}
+    for path, (scenario_result, elapsed) in zip(paths, results):
+        timings[path.name] = elapsed
+        if scenario_result is not None:
+            processed[path.name] = scenario_result
+    return processed, timings
+
+
 def load_data_items_to_dynamo(folder_path):
     for path in Path(folder_path).iterdir():
         if path.suffix != ".json":
@@ -277,39 +739,14 @@ def load_data_items_to_dynamo(folder_path):
 
 
 def clean_responses(data: dict, ignore_keys: list) -> dict:
-    return _mask_volatile_fields(data, ignore_keys)
-
-
-def _mask_volatile_fields(data, keys_to_mask, placeholder="<ignored>"):
-    if isinstance(data, dict):
-        result = {}
-        for key, value in data.items():
-            # Always recurse first
-            if isinstance(value, (dict, list)):
-                masked_value = _mask_volatile_fields(value, keys_to_mask, placeholder)
-            else:
-                masked_value = value
-            # Then decide if this key should be masked
-            result[key] = placeholder if key in keys_to_mask else masked_value
-        return result
-    if isinstance(data, list):
-        return [_mask_volatile_fields(item, keys_to_mask, placeholder) for item in data]
-    return data
+    cleaned_data, _ = transform_document(data, mask_keys=ignore_keys)
+    return cleaned_data
 
 
 def _encrypt_nhs_numbers(
-    dynamo_items: list[dict[str, object]], secret_key: bytes
+    dynamo_items: list[dict[str, object]], secret_key: bytes, serialized: bool = False
 ) -> list[dict[str, object]]:
-    encrypted_items = deepcopy(dynamo_items)
-
-    for item in encrypted_items:
-        if "NHS_NUMBER" in item:
-            nhs_number = str(item["NHS_NUMBER"])
-            item["NHS_NUMBER"] = hmac.new(
-                secret_key, nhs_number.encode(), hashlib.sha512
-            ).hexdigest()
-
-    return encrypted_items
+    return get_nhs_number_hasher().hash_items(dynamo_items, secret_key, serialized)
 
 
 def _get_scenario_secret_for_hashing(
@@ -20,6 +20,7 @@ class TemplateEngine:
         self.templates = templates
         self.inheritance = inheritance
         self._built_templates = None  # cache for built template lookup
+        self._nested_keys = None  # template keys holding dicts or lists
 
     @classmethod
     @lru_cache(maxsize=1)
@@ -44,7 +45,15 @@ class TemplateEngine:
 
         # Build templates only once and cache them
         if self._built_templates is None:
-            built = self.build()
+            built = self._build_shared()
+            self._nested_keys = {
+                item[self.MERGE_KEY]: tuple(
+                    key
+                    for key, value in item.items()
+                    if isinstance(value, (dict, list))
+                )
+                for item in built
+            }
             self._built_templates = {item[self.MERGE_KEY]: item for item in built}
 
         templates = self._built_templates
@@ -56,15 +65,32 @@ class TemplateEngine:
             if attr_type not in templates:
                 raise ValueError(f"Unknown template type: {attr_type}")
 
-            merged = copy.deepcopy(templates[attr_type])
+            # Shallow copy keeps the template key order; only nested template
+            # values the scenario does not override need their own copy.
+            merged = dict(templates[attr_type])
             merged.update(item)
+            for key in self._nested_keys[attr_type]:
+                if key not in item:
+                    merged[key] = copy.deepcopy(merged[key])
 
             resolved.append(merged)
 
         return resolved
 
     def build(self):
-        """Build the fully merged template."""
+        """Build the fully merged template.
+
+        The result is the caller's own copy and may be changed freely.
+        """
+        return copy.deepcopy(self._build_shared())
+
+    def _build_shared(self):
+        """Build the merged template without copying nested values.
+
+        Nested dicts and lists are shared with ``self.templates``, so the
+        result must not be mutated; apply() copies them before they reach a
+        scenario.
+        """
         merged = self._index_by_attribute_type(self.templates)
 
         for child, parent in self.inheritance.items():
@@ -92,13 +118,13 @@ class TemplateEngine:
             if not key:
                 raise ValueError(f"Missing {TemplateEngine.MERGE_KEY} in template item")
 
-            index[key] = copy.deepcopy(item)
+            index[key] = dict(item)
 
         return index
 
     @staticmethod
     def _merge_objects(parent, child):
-        """Merge parent template into child."""
-        merged = copy.deepcopy(parent)
+        """Merge parent template into child, sharing nested values with both."""
+        merged = dict(parent)
         merged.update(child)
         return merged
@@ -0,0 +1,74 @@
+from typing import Any, Iterable
+
+from .placeholder_utils import PlaceholderResolver
+
+MASK_PLACEHOLDER = "<ignored>"
+
+_NHS_NUMBER_KEY = "nhsnumber"
+
+
+def _is_nhs_number_key(key) -> bool:
+    return isinstance(key, str) and key.lower().replace("_", "") == _NHS_NUMBER_KEY
+
+
+def transform_document(
+    data: Any,
+    file_name: str = "",
+    *,
+    resolver: PlaceholderResolver | None = None,
+    mask_keys: Iterable[str] = (),
+    capture_nhs_number: bool = False,
+    mask_placeholder: str = MASK_PLACEHOLDER,
+) -> tuple[Any, Any]:
+    """Copy a JSON document in a single iterative pass.
+
+    While copying, string values are passed through ``resolver`` (if given),
+    values under any key in ``mask_keys`` are replaced by ``mask_placeholder``
+    and, with ``capture_nhs_number``, the first non-empty value under an
+    NHS number key (``NHS_NUMBER``, ``nhsNumber``, ...) in document order is
+    recorded. An explicit stack is used instead of recursion so arbitrarily
+    deep documents cannot hit the recursion limit.
+
+    Returns:
+        A tuple of the transformed copy and the captured NHS number (or None).
+    """
+    mask_keys = frozenset(mask_keys)
+    nhs_number = None
+    root: list[Any] = [None]
+
+    # Each task copies ``value`` into ``target[slot]``, or appends it to
+    # ``target`` when ``slot`` is None. Children are pushed in reverse so they
+    # are visited, and inserted, in their original order.
+    stack: list[tuple[Any, Any, Any, Any]] = [(data, root, 0, None)]
+    while stack:
+        value, target, slot, key = stack.pop()
+
+        if key is not None and key in mask_keys:
+            result = mask_placeholder
+        elif isinstance(value, dict):
+            result = {}
+            for child_key, child in reversed(value.items()):
+                stack.append((child, result, child_key, child_key))
+        elif isinstance(value, list):
+            result = []
+            for child in reversed(value):
+                stack.append((child, result, None, None))
+        elif resolver is not None and isinstance(value, str):
+            result = resolver.resolve(value, file_name)
+        else:
+            result = value
+
+        if slot is None:
+            target.append(result)
+        else:
+            target[slot] = result
+
+        if (
+            capture_nhs_number
+            and nhs_number is None
+            and result
+            and _is_nhs_number_key(key)
+        ):
+            nhs_number = result
+
+    return root[0], nhs_number
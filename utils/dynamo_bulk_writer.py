@@ -0,0 +1,163 @@
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.aws_clients import get_client, max_pool_connections
+from utils.dynamo_serialization import (
+    DYNAMO_KEY_ATTRIBUTES,
+    item_key_values,
+    serialize_item,
+)
+
+logger = logging.getLogger(__name__)
+
+# BatchWriteItem accepts at most 25 requests per call
+_BATCH_WRITE_LIMIT = 25
+_DEFAULT_WORKERS = 8
+# Attempts at UnprocessedItems, which botocore does not retry. Throttling
+# errors are already retried by the client's adaptive retry mode.
+_MAX_ATTEMPTS = 8
+_BASE_BACKOFF_SECONDS = 0.05
+_MAX_BACKOFF_SECONDS = 5.0
+
+
+def dynamodb_endpoint_url() -> str | None:
+    """DYNAMODB_ENDPOINT_URL points DynamoDB calls at a local stand-in."""
+    return os.getenv("DYNAMODB_ENDPOINT_URL") or None
+
+
+def _bulk_write_workers() -> int:
+    """Writer threads, overridable with DYNAMO_WRITE_WORKERS.
+
+    Capped below the client's connection pool, which scans and reads made
+    alongside the writes also draw on.
+    """
+    workers = int(os.getenv("DYNAMO_WRITE_WORKERS", _DEFAULT_WORKERS))
+    return max(1, min(workers, max_pool_connections() - 1))
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(
+        0, min(_MAX_BACKOFF_SECONDS, _BASE_BACKOFF_SECONDS * 2**attempt)
+    )
+
+
+class DynamoBulkWriter:
+    """Writes items with BatchWriteItem calls spread across a thread pool.
+
+    Threads share the registry's low-level client, whose connection pool is
+    sized for parallel callers, and the writer's one pool, so concurrent
+    calls share its workers rather than each starting their own.
+    UnprocessedItems are retried with jittered exponential backoff. Each
+    call returns its own stats, so calls may be made from any thread.
+    """
+
+    def __init__(self, table_name, region="eu-west-2", client=None, max_workers=None):
+        self.table_name = table_name
+        self.max_workers = max_workers or _bulk_write_workers()
+        self.client = client or get_client(
+            "dynamodb", region, endpoint_url=dynamodb_endpoint_url()
+        )
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="dynamo-writer"
+                )
+            return self._executor
+
+    def _unique_requests(self, items, serialized: bool) -> list[dict]:
+        """PutRequests for ``items``, keeping the last item for a repeated key.
+
+        BatchWriteItem rejects a call that writes the same key twice, and
+        sequential writes would have left the last one in the table.
+        """
+        requests = {}
+        for item in items:
+            key = item_key_values(item, serialized)
+            requests.pop(key, None)
+            requests[key] = {
+                "PutRequest": {"Item": item if serialized else serialize_item(item)}
+            }
+        return list(requests.values())
+
+    def _write_batch(self, requests: list[dict]) -> tuple[int, int]:
+        """Write one batch; returns its (retries, throttles)."""
+        pending = {self.table_name: requests}
+        retries = throttles = 0
+        for attempt in range(_MAX_ATTEMPTS):
+            response = self.client.batch_write_item(RequestItems=pending)
+            # Throttled attempts the client retried before this response
+            throttles += response.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+            pending = response.get("UnprocessedItems") or {}
+            if not pending:
+                return retries, throttles
+            retries += 1
+            time.sleep(_backoff_delay(attempt))
+
+        raise RuntimeError(
+            f"{len(pending.get(self.table_name, []))} items still unprocessed "
+            f"after {_MAX_ATTEMPTS} BatchWriteItem attempts"
+        )
+
+    def write(self, items) -> dict:
+        """Write ``items`` to the table; returns the call's stats.
+
+        The stats are the number of ``items`` written, the ``retries`` of
+        UnprocessedItems, the ``throttles`` absorbed by the client and the
+        ``seconds`` taken.
+        """
+        return self._send(self._unique_requests(items, serialized=False), "wrote")
+
+    def write_serialized(self, items) -> dict:
+        """Write items already in AttributeValue form, as serialize_item returns."""
+        return self._send(self._unique_requests(items, serialized=True), "wrote")
+
+    def delete(self, keys) -> dict:
+        """Delete the items with the given primary ``keys``; returns the stats."""
+        requests = {}
+        for key in keys:
+            requests[item_key_values(key)] = {
+                "DeleteRequest": {
+                    "Key": serialize_item(
+                        {name: key[name] for name in DYNAMO_KEY_ATTRIBUTES}
+                    )
+                }
+            }
+        return self._send(list(requests.values()), "deleted")
+
+    def _send(self, requests: list[dict], action: str) -> dict:
+        batches = [
+            requests[i : i + _BATCH_WRITE_LIMIT]
+            for i in range(0, len(requests), _BATCH_WRITE_LIMIT)
+        ]
+
+        start = time.perf_counter()
+        # list() re-raises the first failed batch
+        batch_stats = list(self.executor.map(self._write_batch, batches))
+        stats = {
+            "items": len(requests),
+            "retries": sum(retries for retries, _ in batch_stats),
+            "throttles": sum(throttles for _, throttles in batch_stats),
+            "seconds": time.perf_counter() - start,
+        }
+
+        logger.info(
+            "Bulk %s %d items in %s in %.2fs (%.0f items/s, %d retries, %d throttles)",
+            action,
+            stats["items"],
+            self.table_name,
+            stats["seconds"],
+            stats["items"] / stats["seconds"] if stats["seconds"] else 0.0,
+            stats["retries"],
+            stats["throttles"],
+        )
+        return stats
@@ -1,9 +1,30 @@
 import json
 import logging
 import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
-import boto3
+from boto3.dynamodb.types import TypeDeserializer
+from utils.aws_clients import get_client, get_resource
 from utils.common_utils import save_to_file, load_from_file
+from utils.dynamo_bulk_writer import DynamoBulkWriter, dynamodb_endpoint_url
+from utils.dynamo_readiness import wait_for_keys
+from utils.dynamo_seed_manifest import (
+    invalidate_seed_manifest,
+    seed_manifest_path,
+    seeded_keys,
+)
+from utils.dynamo_snapshot import SnapshotWriter, read_snapshot, snapshot_path
+from utils.key_ledger import (
+    current_run_id,
+    key_ledger_enabled,
+    key_ledger_path,
+    other_run_keys,
+    read_keys,
+    record_keys,
+)
+from utils.seed_pipeline import iter_batches, write_batches_in_background
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
@@ -11,24 +32,38 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 DYNAMO_TEMP_LOCATION = "data/dynamoDB/temp/"
 
+# In auto mode, tables with at most this many items are truncated in place
+# rather than deleted and recreated
+_DEFAULT_TRUNCATE_MAX_ITEMS = 50_000
+_DEFAULT_SCAN_SEGMENTS = 8
+# Table tag given a new value whenever the table is emptied in place, as the
+# table's creation time only changes when it is recreated
+RESET_GENERATION_TAG = "SeedResetGeneration"
+
 
 class DynamoDBHelper:
     def __init__(self, table_name, environment):
         # Create DynamoDB resource using credentials from env
         self.environment = environment
         self.table_name = table_name
-        self.dynamodb_client = boto3.client("dynamodb", "eu-west-2")
-        self.dynamodb_resource = boto3.resource("dynamodb", "eu-west-2")
+        self.dynamodb_client = get_client(
+            "dynamodb", "eu-west-2", endpoint_url=dynamodb_endpoint_url()
+        )
+        self.dynamodb_resource = get_resource(
+            "dynamodb", "eu-west-2", endpoint_url=dynamodb_endpoint_url()
+        )
         self.table = self.dynamodb_resource.Table(table_name)
         self.table_arn = None
         self.attribute_definitions = None
         self.key_schema = None
         self.tags = None
+        self._bulk_writer = None
 
     def insert_item(self, item: dict):
         """
         Insert a single item into the table.
         """
+        self._record_written_keys([item])
         try:
             response = self.table.put_item(Item=item)
         except ClientError as e:
@@ -41,18 +76,139 @@ class DynamoDBHelper:
 
     def insert_items(self, items: list):
         """
-        Insert multiple items using batch_writer.
+        Insert multiple items in parallel batches, retrying unprocessed items.
         """
+        self._record_written_keys(items)
         try:
-            with self.table.batch_writer() as batch:
-                for item in items:
-                    batch.put_item(Item=item)
+            self.bulk_writer.write(items)
         except ClientError as e:
             logger.exception("Batch insert failed: %s", e.response["Error"]["Message"])
             raise
         else:
             logger.info("Batch insert complete.")
 
+    def insert_serialized_items(self, items: list):
+        """
+        Insert items already in AttributeValue form through the client API.
+        """
+        self._record_written_keys(items, serialized=True)
+        try:
+            self.bulk_writer.write_serialized(items)
+        except ClientError as e:
+            logger.exception("Batch insert failed: %s", e.response["Error"]["Message"])
+            raise
+        else:
+            logger.info("Batch insert complete.")
+
+    def _record_written_keys(self, items, serialized: bool = False):
+        # Recorded before writing, so keys from a partly failed write can
+        # still be cleaned up
+        if key_ledger_enabled():
+            record_keys(
+                key_ledger_path(self.environment, self.table_name, current_run_id()),
+                items,
+                serialized,
+            )
+
+    @property
+    def bulk_writer(self) -> DynamoBulkWriter:
+        if self._bulk_writer is None:
+            self._bulk_writer = DynamoBulkWriter(self.table_name)
+        return self._bulk_writer
+
+    def delete_items(self, keys: list):
+        """
+        Delete multiple items by primary key in parallel batches.
+        """
+        try:
+            self.bulk_writer.delete(keys)
+        except ClientError as e:
+            logger.exception("Batch delete failed: %s", e.response["Error"]["Message"])
+            raise
+        else:
+            logger.info("Batch delete complete.")
+
+    def wait_for_items(
+        self, items: list, timeout_seconds: float, serialized: bool = False
+    ) -> float:
+        """
+        Wait until every item's key can be read back with a consistent read.
+        """
+        return wait_for_keys(
+            self.bulk_writer.client,
+            self.table_name,
+            items,
+            timeout_seconds,
+            serialized=serialized,
+        )
+
+    def truncate(self, segments: int = _DEFAULT_SCAN_SEGMENTS) -> int:
+        """
+        Delete every item, scanning the table in parallel segments.
+
+        The reset generation is bumped first, so even a truncate that fails
+        part way invalidates every seed manifest.
+
+        Returns the number of items deleted.
+        """
+        self.bump_reset_generation()
+
+        deserializer = TypeDeserializer()
+
+        def truncate_segment(segment):
+            deleted = 0
+            for items in self._scan_segment(
+                segment, segments, ProjectionExpression="NHS_NUMBER, ATTRIBUTE_TYPE"
+            ):
+                if items:
+                    keys = [
+                        {
+                            name: deserializer.deserialize(value)
+                            for name, value in item.items()
+                        }
+                        for item in items
+                    ]
+                    deleted += self.bulk_writer.delete(keys)["items"]
+            return deleted
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            return sum(executor.map(truncate_segment, range(segments)))
+
+    def export_items(
+        self, writer: SnapshotWriter, segments: int = _DEFAULT_SCAN_SEGMENTS
+    ) -> int:
+        """
+        Write every item to a snapshot, scanning the table in parallel segments.
+
+        Returns the number of items exported.
+        """
+
+        def export_segment(segment):
+            exported = 0
+            for items in self._scan_segment(segment, segments, ConsistentRead=True):
+                if items:
+                    writer.write(items)
+                    exported += len(items)
+            return exported
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            return sum(executor.map(export_segment, range(segments)))
+
+    def _scan_segment(self, segment: int, segments: int, **scan_kwargs):
+        """
+        Yield each page of raw AttributeValue items from one scan segment.
+        """
+        # Scans go through the shared client, as resources are not thread-safe
+        scan_kwargs.update(
+            TableName=self.table_name, Segment=segment, TotalSegments=segments
+        )
+        while True:
+            page = self.dynamodb_client.scan(**scan_kwargs)
+            yield page["Items"]
+            if "LastEvaluatedKey" not in page:
+                return
+            scan_kwargs["ExclusiveStartKey"] = page["LastEvaluatedKey"]
+
     def get_item(self, key: dict):
         """
         Retrieve a single item by primary key.
@@ -111,6 +267,45 @@ class DynamoDBHelper:
 
         return self.table_arn, self.attribute_definitions, self.key_schema
 
+    def table_identity(self):
+        """
+        Return a value that changes whenever the table is emptied.
+
+        Combines the creation time, which changes when the table is
+        recreated, with the reset generation tag, which truncate changes.
+        """
+        table_description = self.dynamodb_client.describe_table(
+            TableName=self.table_name
+        )["Table"]
+        tags = self.dynamodb_client.list_tags_of_resource(
+            ResourceArn=table_description["TableArn"]
+        )["Tags"]
+        generation = next(
+            (tag["Value"] for tag in tags if tag["Key"] == RESET_GENERATION_TAG), ""
+        )
+        return f"{table_description['CreationDateTime']}/{generation}"
+
+    def bump_reset_generation(self):
+        """
+        Tag the table with a new reset generation, so seed manifests written
+        on any machine before it was emptied are no longer trusted.
+        """
+        table_arn = self.dynamodb_client.describe_table(TableName=self.table_name)[
+            "Table"
+        ]["TableArn"]
+        self.dynamodb_client.tag_resource(
+            ResourceArn=table_arn,
+            Tags=[{"Key": RESET_GENERATION_TAG, "Value": uuid.uuid4().hex}],
+        )
+
+    def item_count(self):
+        """
+        Return DynamoDB's approximate item count, refreshed about every six hours.
+        """
+        return self.dynamodb_client.describe_table(TableName=self.table_name)["Table"][
+            "ItemCount"
+        ]
+
     def get_table_tags(self):
         self.tags = self.dynamodb_client.list_tags_of_resource(
             ResourceArn=self.table_arn
@@ -206,6 +401,12 @@ def file_backup_exists(dynamo_db_table: DynamoDBHelper):
 
 
 def reset_dynamo_tables():
+    """Empty the test table in dev or test.
+
+    DYNAMO_RESET_MODE chooses how: ``truncate`` deletes every item in place,
+    ``recreate`` deletes and recreates the table, and ``auto`` (the default)
+    truncates tables holding at most DYNAMO_TRUNCATE_MAX_ITEMS items.
+    """
     environment = os.getenv("ENVIRONMENT")
     table_name = os.getenv("DYNAMODB_TABLE_NAME")
 
@@ -216,7 +417,155 @@ def reset_dynamo_tables():
         )
         return
     dynamo_db_table = DynamoDBHelper(table_name, environment)
+    invalidate_seed_manifest(environment, table_name)
+
+    reset_mode = _choose_reset_mode(dynamo_db_table)
+    start = time.perf_counter()
+    if reset_mode == "truncate":
+        deleted = dynamo_db_table.truncate(
+            int(os.getenv("DYNAMO_SCAN_SEGMENTS", _DEFAULT_SCAN_SEGMENTS))
+        )
+        logger.info(f"Deleted {deleted} items from '{table_name}'")
+    else:
+        _recreate_table(dynamo_db_table, table_name)
+    logger.info(
+        f"Reset '{table_name}' by {reset_mode} in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def cleanup_run_keys(run_id=None):
+    """Delete the keys a run recorded in its key ledger, in dev or test.
+
+    The run defaults to TEST_RUN_ID; one of the two must be given. A run's
+    ledger also lists keys it only overwrote, so keys that this machine's
+    seed manifest or another run's ledger records are left in place. The
+    ledger is removed once its keys are deleted.
+
+    Raises:
+        ValueError: If no run is given.
+    """
+    environment = os.getenv("ENVIRONMENT")
+    table_name = os.getenv("DYNAMODB_TABLE_NAME")
+    run_id = run_id or current_run_id()
+    if not run_id:
+        raise ValueError("Set TEST_RUN_ID to the run whose keys should be deleted")
+
+    if environment not in ["dev", "test"]:
+        logger.warning(
+            f"{environment} is not supported. Cleaning up DynamoDB is only supported in dev or test."
+        )
+        return
+    ledger_path = key_ledger_path(environment, table_name, run_id)
+    keys = read_keys(ledger_path)
+    if not keys:
+        logger.info(f"No keys recorded for run '{run_id}' in '{table_name}'")
+        return
+
+    shared_keys = other_run_keys(ledger_path, environment, table_name) | seeded_keys(
+        seed_manifest_path(environment, table_name)
+    )
+    owned_keys = [
+        key
+        for key in keys
+        if (key["NHS_NUMBER"], key["ATTRIBUTE_TYPE"]) not in shared_keys
+    ]
+
+    start = time.perf_counter()
+    if owned_keys:
+        dynamo_db_table = DynamoDBHelper(table_name, environment)
+        dynamo_db_table.delete_items(owned_keys)
+        # Other machines' seed manifests may still list the deleted keys. The
+        # local manifest is kept, so later cleanups still protect its keys.
+        dynamo_db_table.bump_reset_generation()
+    ledger_path.unlink()
+    logger.info(
+        f"Deleted {len(owned_keys)} keys written by run '{run_id}' from "
+        f"'{table_name}' in {time.perf_counter() - start:.1f}s, keeping "
+        f"{len(keys) - len(owned_keys)} preloaded or written by other runs"
+    )
+
+
+def export_dynamo_snapshot(path=None):
+    """Save every item in the test table to a local snapshot.
+
+    The table's metadata is backed up alongside, so a restore can recreate
+    the table if it has since been deleted. Returns the snapshot's path.
+    """
+    environment = os.getenv("ENVIRONMENT")
+    table_name = os.getenv("DYNAMODB_TABLE_NAME")
+    path = path or snapshot_path(environment, table_name)
+    segments = int(os.getenv("DYNAMO_SCAN_SEGMENTS", _DEFAULT_SCAN_SEGMENTS))
+
+    dynamo_db_table = DynamoDBHelper(table_name, environment)
+    dynamo_db_table.describe_table()
+    dynamo_db_table.get_table_tags()
+
+    start = time.perf_counter()
+    with SnapshotWriter(path) as writer:
+        exported = dynamo_db_table.export_items(writer, segments)
+    logger.info(
+        f"Exported {exported} items from '{table_name}' to {path} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return path
+
+
+def restore_dynamo_snapshot(path=None):
+    """Reset the test table in dev or test and fill it from a snapshot.
 
+    The table is emptied first, or recreated from the backed up metadata if
+    it no longer exists, then the snapshot is written back in bulk.
+    """
+    environment = os.getenv("ENVIRONMENT")
+    table_name = os.getenv("DYNAMODB_TABLE_NAME")
+
+    if environment not in ["dev", "test"]:
+        logger.warning(
+            f"{environment} is not supported. Restoring DynamoDB is only supported in dev or test."
+        )
+        return
+    path = path or snapshot_path(environment, table_name)
+    if not path.exists():
+        raise FileNotFoundError(f"No DynamoDB snapshot found at {path}")
+
+    reset_dynamo_tables()
+
+    start = time.perf_counter()
+    # Written through the helper so the run's key ledger records the keys
+    restored = write_batches_in_background(
+        iter_batches(read_snapshot(path)),
+        DynamoDBHelper(table_name, environment).insert_serialized_items,
+    )
+    logger.info(
+        f"Restored {restored} items to '{table_name}' from {path} "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+def _choose_reset_mode(dynamo_db_table: DynamoDBHelper) -> str:
+    reset_mode = os.getenv("DYNAMO_RESET_MODE", "auto").lower()
+    if reset_mode in ("truncate", "recreate"):
+        return reset_mode
+    if reset_mode != "auto":
+        raise ValueError(f"Unknown DYNAMO_RESET_MODE: {reset_mode}")
+
+    max_items = int(os.getenv("DYNAMO_TRUNCATE_MAX_ITEMS", _DEFAULT_TRUNCATE_MAX_ITEMS))
+    try:
+        item_count = dynamo_db_table.item_count()
+    except ClientError as e:
+        # e.g. the table is missing, which only the recreate path handles
+        logger.warning(f"Unable to count items, recreating the table: {e}")
+        return "recreate"
+
+    reset_mode = "truncate" if item_count <= max_items else "recreate"
+    logger.info(
+        f"'{dynamo_db_table.table_name}' holds about {item_count} items, "
+        f"resetting by {reset_mode}"
+    )
+    return reset_mode
+
+
+def _recreate_table(dynamo_db_table: DynamoDBHelper, table_name):
     # --- Step 1: Fetch table information ---
     try:
         table_arn, attribute_definitions, key_schema = dynamo_db_table.describe_table()
@@ -286,9 +635,9 @@ def load_information_from_backup_files(dynamo_db_table: DynamoDBHelper):
 _cached_dynamo_helper: "DynamoDBHelper | None" = None
 
 
-def insert_into_dynamo(data):
+def get_dynamo_helper() -> DynamoDBHelper:
+    """Return a helper for the configured table, reusing it between calls."""
     global _cached_dynamo_helper
-    logger.debug("Inserting %d items into Dynamo", len(data))
     environment = os.getenv("ENVIRONMENT")
     dynamodb_table_name = os.getenv("DYNAMODB_TABLE_NAME")
 
@@ -298,5 +647,14 @@ def insert_into_dynamo(data):
     ):
         _cached_dynamo_helper = DynamoDBHelper(dynamodb_table_name, environment)
 
-    table = _cached_dynamo_helper
-    table.insert_items(data)
+    return _cached_dynamo_helper
+
+
+def insert_into_dynamo(data):
+    logger.debug("Inserting %d items into Dynamo", len(data))
+    get_dynamo_helper().insert_items(data)
+
+
+def insert_serialized_into_dynamo(data):
+    logger.debug("Inserting %d serialized items into Dynamo", len(data))
+    get_dynamo_helper().insert_serialized_items(data)
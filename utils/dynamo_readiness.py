@@ -0,0 +1,104 @@
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.dynamo_serialization import (
+    DYNAMO_KEY_ATTRIBUTES,
+    item_key_values,
+    serialize_item,
+)
+
+logger = logging.getLogger(__name__)
+
+# BatchGetItem accepts at most 100 keys per call
+_BATCH_GET_LIMIT = 100
+_DEFAULT_MAX_WORKERS = 8
+# Pause between rounds, just long enough not to spin on a lagging table
+_ROUND_BACKOFF_SECONDS = 0.2
+
+
+def _fetch_visible(client, table_name, keys: list[dict]) -> set[tuple]:
+    """Return the keys in one batch of serialized keys that a consistent read can see."""
+    response = client.batch_get_item(
+        RequestItems={
+            table_name: {
+                "Keys": keys,
+                "ConsistentRead": True,
+                "ProjectionExpression": ", ".join(DYNAMO_KEY_ATTRIBUTES),
+            }
+        }
+    )
+    # Anything in UnprocessedKeys is simply not found yet and retried next round
+    return {
+        item_key_values(item, serialized=True)
+        for item in response.get("Responses", {}).get(table_name, [])
+    }
+
+
+def wait_for_keys(
+    client,
+    table_name,
+    keys,
+    timeout_seconds: float,
+    max_workers: int = _DEFAULT_MAX_WORKERS,
+    serialized: bool = False,
+) -> float:
+    """Block until every key can be read back from the table.
+
+    Keys are checked with parallel, consistent BatchGetItem calls. Each round
+    only re-reads the keys that were missing or unprocessed in the last one.
+    ``keys`` may be whole items; with ``serialized`` they are in
+    AttributeValue form.
+
+    Returns:
+        The seconds taken for all keys to become visible.
+
+    Raises:
+        TimeoutError: If some keys are still missing after ``timeout_seconds``.
+    """
+    pending = {}
+    for key in keys:
+        key_attributes = {name: key[name] for name in DYNAMO_KEY_ATTRIBUTES}
+        pending[item_key_values(key, serialized)] = (
+            key_attributes if serialized else serialize_item(key_attributes)
+        )
+    total = len(pending)
+    start = time.perf_counter()
+    deadline = start + timeout_seconds
+    rounds = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending:
+            rounds += 1
+            remaining = list(pending.values())
+            batches = [
+                remaining[i : i + _BATCH_GET_LIMIT]
+                for i in range(0, len(remaining), _BATCH_GET_LIMIT)
+            ]
+            for visible in executor.map(
+                lambda batch: _fetch_visible(client, table_name, batch), batches
+            ):
+                for key in visible:
+                    pending.pop(key, None)
+
+            if not pending:
+                break
+            if time.perf_counter() >= deadline:
+                raise TimeoutError(
+                    f"{len(pending)} of {total} keys still not readable from "
+                    f"{table_name} after {timeout_seconds}s, e.g. "
+                    f"{next(iter(pending))}"
+                )
+            logger.debug("%d keys not yet visible after round %d", len(pending), rounds)
+            time.sleep(random.uniform(0, _ROUND_BACKOFF_SECONDS))
+
+    seconds = time.perf_counter() - start
+    logger.info(
+        "All %d keys readable from %s after %.2fs (%d rounds)",
+        total,
+        table_name,
+        seconds,
+        rounds,
+    )
+    return seconds
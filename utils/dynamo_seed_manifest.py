@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SEED_MANIFEST_LOCATION = "data/dynamoDB/temp/"
+
+# Bump when the recorded item digests or table identity change meaning
+_SEED_MANIFEST_VERSION = 2
+
+_KEY_SEPARATOR = "|"
+
+
+def seed_manifest_path(
+    environment, table_name, directory: str | Path = SEED_MANIFEST_LOCATION
+) -> Path:
+    return Path(directory) / f"seed_manifest-{environment}-{table_name}.json"
+
+
+def full_reseed_requested() -> bool:
+    """DYNAMO_FULL_RESEED=true ignores the manifest and rewrites every item."""
+    return os.getenv("DYNAMO_FULL_RESEED", "").lower() == "true"
+
+
+def item_key(item: dict) -> str:
+    return (
+        f"{item.get('NHS_NUMBER', '')}{_KEY_SEPARATOR}{item.get('ATTRIBUTE_TYPE', '')}"
+    )
+
+
+def key_to_dynamo_key(key: str) -> dict:
+    nhs_number, attribute_type = key.split(_KEY_SEPARATOR, 1)
+    return {"NHS_NUMBER": nhs_number, "ATTRIBUTE_TYPE": attribute_type}
+
+
+def item_digest(item: dict) -> str:
+    return hashlib.sha256(
+        json.dumps(item, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def load_seed_manifest(path: Path, table_identity: str | None) -> dict[str, str] | None:
+    """Return the key → digest map written last time, or None if unusable.
+
+    The manifest is only trusted if it was written for the same table
+    identity (see DynamoDBHelper.table_identity), so a table that was
+    recreated or truncated since, from any machine, is reseeded in full.
+    """
+    manifest = _read_seed_manifest(path)
+    if manifest is None:
+        return None
+    if table_identity is None or manifest.get("table_identity") != table_identity:
+        logger.info("Table was emptied since %s was written", path.name)
+        return None
+    return manifest.get("items", {})
+
+
+def seeded_keys(path: Path) -> set[tuple[str, str]]:
+    """Return the (NHS_NUMBER, ATTRIBUTE_TYPE) keys a preload recorded.
+
+    Unlike load_seed_manifest, the table identity is not checked, so keys
+    are returned even if the table was emptied since. Returns an empty set
+    if there is no usable manifest.
+    """
+    manifest = _read_seed_manifest(path)
+    if manifest is None:
+        return set()
+    return {tuple(key.split(_KEY_SEPARATOR, 1)) for key in manifest.get("items", {})}
+
+
+def _read_seed_manifest(path: Path) -> dict | None:
+    try:
+        with path.open(encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Ignoring unreadable seed manifest %s: %s", path, e)
+        return None
+
+    if manifest.get("version") != _SEED_MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def save_seed_manifest(
+    path: Path, table_identity: str | None, digests: dict[str, str]
+) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": _SEED_MANIFEST_VERSION,
+                    "table_identity": table_identity,
+                    "items": digests,
+                },
+                f,
+            )
+        tmp_path.replace(path)
+    except OSError as e:
+        logger.warning("Failed to write seed manifest %s: %s", path, e)
+
+
+def invalidate_seed_manifest(environment, table_name) -> None:
+    """Forget what was written, so the next preload reseeds in full."""
+    seed_manifest_path(environment, table_name).unlink(missing_ok=True)
+
+
+def plan_incremental_seed(
+    items: list[dict], previous: dict[str, str] | None
+) -> tuple[list[dict], list[str], dict[str, str]]:
+    """Work out which items need writing and which keys need deleting.
+
+    Returns:
+        The items that are new or changed since ``previous``, the keys in
+        ``previous`` that are no longer present, and the key → digest map
+        describing ``items``.
+    """
+    previous = previous or {}
+    digests = {}
+    to_write = []
+    for item in items:
+        key = item_key(item)
+        digest = item_digest(item)
+        digests[key] = digest
+        if previous.get(key) != digest:
+            to_write.append(item)
+
+    to_delete = [key for key in previous if key not in digests]
+    return to_write, to_delete, digests
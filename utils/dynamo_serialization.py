@@ -0,0 +1,32 @@
+"""Conversion of DynamoDB items to the AttributeValue wire format.
+
+Items are serialized once, as they are seeded, and handed to the low-level
+client as ready-made payloads, rather than through the resource layer, which
+runs TypeSerializer again on every put.
+"""
+
+from boto3.dynamodb.types import TypeSerializer
+
+DYNAMO_KEY_ATTRIBUTES = ("NHS_NUMBER", "ATTRIBUTE_TYPE")
+
+_serializer = TypeSerializer()
+
+
+def serialize_item(item: dict) -> dict:
+    """Return ``item`` as a map of attribute name to AttributeValue."""
+    return {name: _serializer.serialize(value) for name, value in item.items()}
+
+
+def attribute_value(value):
+    """Return the scalar held in an AttributeValue such as ``{"S": "x"}``."""
+    return next(iter(value.values()))
+
+
+def item_key_values(item: dict, serialized: bool = False) -> tuple[str, ...]:
+    """Return the (NHS_NUMBER, ATTRIBUTE_TYPE) key of a plain or serialized item."""
+    if serialized:
+        return tuple(
+            str(attribute_value(item[name])) if name in item else ""
+            for name in DYNAMO_KEY_ATTRIBUTES
+        )
+    return tuple(str(item.get(name, "")) for name in DYNAMO_KEY_ATTRIBUTES)
@@ -3,11 +3,12 @@ import os
 from pathlib import Path
 from typing import Any
 
-import boto3
 import requests
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 from requests import Response
+from utils import json_codec
+from utils.aws_clients import get_client
 from utils.data_helper import clean_responses
 
 ignore_keys = ["lastUpdated", "responseId", "id"]
@@ -43,7 +44,7 @@ class EligibilityApiClient:
 
     def _get_ssm_parameter(self, param_name: str, *, decrypt: bool = True) -> str:
         try:
-            client = boto3.client("ssm")
+            client = get_client("ssm")
             response = client.get_parameter(Name=param_name, WithDecryption=decrypt)
             return response["Parameter"]["Value"]
         except ClientError as e:
@@ -111,7 +112,7 @@ class EligibilityApiClient:
 
     def _parse_response(self, response: Response) -> dict[str, Any]:
         try:
-            data = response.json()
+            data = json_codec.loads(response.content, site="api_response")
             cleaned = clean_responses(data=data, ignore_keys=ignore_keys)
         except json.JSONDecodeError:
             cleaned = response.text
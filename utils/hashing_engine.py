@@ -0,0 +1,157 @@
+import hashlib
+import hmac
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterable
+
+from .dynamo_serialization import attribute_value
+
+logger = logging.getLogger(__name__)
+
+# Below this many uncached NHS numbers, hashing in-process beats the cost of
+# starting a process pool
+_DEFAULT_PARALLEL_THRESHOLD = 50_000
+_PARALLEL_CHUNK_SIZE = 10_000
+# Roughly 100MB of digests; the memo is emptied when it grows past this so
+# streaming very large synthetic datasets does not grow memory without bound
+_MAX_MEMOIZED_DIGESTS = 250_000
+# Workers are spawned rather than forked: seeding hashes while a writer
+# thread and boto3 connection pools are live, and forking those can deadlock
+_PROCESS_START_METHOD = "spawn"
+
+
+def _hash_chunk(secret_key: bytes, nhs_numbers: list[str]) -> list[str]:
+    """Hash a chunk of NHS numbers; runs in worker processes."""
+    keyed = hmac.new(secret_key, digestmod=hashlib.sha512)
+    digests = []
+    for nhs_number in nhs_numbers:
+        mac = keyed.copy()
+        mac.update(nhs_number.encode())
+        digests.append(mac.hexdigest())
+    return digests
+
+
+class NhsNumberHasher:
+    """HMAC-SHA512 hashing of NHS numbers, as done by the API.
+
+    The keyed HMAC is built once per secret and copied for each NHS number,
+    and digests are memoized per (secret, NHS number), so a patient shared
+    by many attribute rows or scenarios is hashed once. Large batches of new
+    NHS numbers are fanned out across a process pool.
+    """
+
+    def __init__(self, parallel_threshold: int | None = None) -> None:
+        if parallel_threshold is None:
+            parallel_threshold = int(
+                os.getenv("HASHING_PARALLEL_THRESHOLD", _DEFAULT_PARALLEL_THRESHOLD)
+            )
+        self.parallel_threshold = parallel_threshold
+        self._keyed: dict[bytes, hmac.HMAC] = {}
+        self._digests: dict[tuple[bytes, str], str] = {}
+        self._lock = threading.Lock()
+
+    def hash(self, nhs_number, secret_key: bytes) -> str:
+        nhs_number = str(nhs_number)
+        memo_key = (secret_key, nhs_number)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            with self._lock:
+                keyed = self._keyed.get(secret_key)
+                if keyed is None:
+                    keyed = hmac.new(secret_key, digestmod=hashlib.sha512)
+                    self._keyed[secret_key] = keyed
+                mac = keyed.copy()
+            mac.update(nhs_number.encode())
+            digest = mac.hexdigest()
+            self._memoize(secret_key, [nhs_number], [digest])
+        return digest
+
+    def _memoize(self, secret_key: bytes, nhs_numbers: list, digests: list) -> None:
+        # Emptied rather than evicted from, which is cheap and keeps the bound
+        if len(self._digests) + len(nhs_numbers) > _MAX_MEMOIZED_DIGESTS:
+            self._digests.clear()
+        self._digests.update(
+            zip(((secret_key, nhs_number) for nhs_number in nhs_numbers), digests)
+        )
+
+    def precompute(self, nhs_numbers: Iterable, secret_key: bytes) -> None:
+        """Hash NHS numbers not already memoized for ``secret_key``.
+
+        At most as many as the memo holds are hashed; any beyond that are
+        hashed on demand by hash().
+        """
+        pending = sorted(
+            {
+                str(nhs_number)
+                for nhs_number in nhs_numbers
+                if (secret_key, str(nhs_number)) not in self._digests
+            }
+        )[:_MAX_MEMOIZED_DIGESTS]
+        if len(pending) < self.parallel_threshold:
+            self._memoize(secret_key, pending, _hash_chunk(secret_key, pending))
+            return
+
+        chunks = [
+            pending[i : i + _PARALLEL_CHUNK_SIZE]
+            for i in range(0, len(pending), _PARALLEL_CHUNK_SIZE)
+        ]
+        logger.info(
+            "Hashing %d NHS numbers across a process pool in %d chunks",
+            len(pending),
+            len(chunks),
+        )
+        with ProcessPoolExecutor(
+            mp_context=multiprocessing.get_context(_PROCESS_START_METHOD)
+        ) as executor:
+            digests = [
+                digest
+                for chunk_digests in executor.map(
+                    _hash_chunk, repeat(secret_key), chunks
+                )
+                for digest in chunk_digests
+            ]
+        self._memoize(secret_key, pending, digests)
+
+    def hash_items(
+        self, items: list[dict], secret_key: bytes, serialized: bool = False
+    ) -> list[dict]:
+        """Return ``items`` with each NHS_NUMBER replaced by its hash.
+
+        Only items carrying an NHS_NUMBER are copied, and only shallowly;
+        nested values are shared with the input, which is left untouched.
+        With ``serialized`` the items are in AttributeValue form and the hash
+        is written back as a string AttributeValue.
+        """
+        if serialized:
+            nhs_numbers = [
+                attribute_value(item["NHS_NUMBER"])
+                for item in items
+                if "NHS_NUMBER" in item
+            ]
+        else:
+            nhs_numbers = [item["NHS_NUMBER"] for item in items if "NHS_NUMBER" in item]
+        self.precompute(nhs_numbers, secret_key)
+
+        hashed_items = []
+        nhs_number_iter = iter(nhs_numbers)
+        for item in items:
+            if "NHS_NUMBER" in item:
+                digest = self.hash(next(nhs_number_iter), secret_key)
+                item = {**item, "NHS_NUMBER": {"S": digest} if serialized else digest}
+            hashed_items.append(item)
+        return hashed_items
+
+
+_default_hasher: NhsNumberHasher | None = None
+
+
+def get_nhs_number_hasher() -> NhsNumberHasher:
+    """Return the process-wide hasher, so memoized digests are shared."""
+    global _default_hasher
+    if _default_hasher is None:
+        _default_hasher = NhsNumberHasher()
+    return _default_hasher
@@ -0,0 +1,105 @@
+"""JSON encoding and decoding for the hot paths of the test harness.
+
+orjson is used when it is installed, otherwise the standard library json
+module. JSON_CODEC=stdlib forces the standard library. Decode errors are
+always json.JSONDecodeError (orjson's error subclasses it), so callers keep
+catching the same exception.
+
+Every call is timed against a call-site label so slow paths show up in
+log_codec_timings().
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+BACKEND = (
+    "orjson"
+    if orjson is not None and os.getenv("JSON_CODEC", "").lower() != "stdlib"
+    else "json"
+)
+
+_timings: dict[str, list[float]] = {}
+_timings_lock = threading.Lock()
+
+
+def _record(site: str, start: float) -> None:
+    elapsed = time.perf_counter() - start
+    with _timings_lock:
+        stats = _timings.setdefault(site, [0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+
+
+def loads(data: str | bytes, site: str = "default") -> Any:
+    """Decode a JSON document."""
+    start = time.perf_counter()
+    try:
+        if BACKEND == "orjson":
+            return orjson.loads(data)
+        return json.loads(data)
+    finally:
+        _record(site, start)
+
+
+def load_file(path: str | Path, site: str = "default") -> Any:
+    """Read and decode a JSON file.
+
+    Raises:
+        OSError: If the file cannot be read.
+        json.JSONDecodeError: If the file is not valid JSON.
+    """
+    return loads(Path(path).read_bytes(), site=site)
+
+
+def dumps(obj: Any, indent: bool = False, site: str = "default") -> str:
+    """Encode ``obj`` as JSON, pretty-printed with two spaces when ``indent``."""
+    start = time.perf_counter()
+    try:
+        if BACKEND == "orjson":
+            try:
+                option = orjson.OPT_INDENT_2 if indent else None
+                return orjson.dumps(obj, option=option).decode("utf-8")
+            except TypeError:
+                # e.g. integers wider than 64 bits; the stdlib copes with these
+                pass
+        return json.dumps(obj, indent=2 if indent else None)
+    finally:
+        _record(site, start)
+
+
+def codec_timings() -> dict[str, dict[str, float]]:
+    """Return call counts and total seconds per call site."""
+    with _timings_lock:
+        return {
+            site: {"calls": calls, "seconds": seconds}
+            for site, (calls, seconds) in _timings.items()
+        }
+
+
+def log_codec_timings() -> None:
+    timings = codec_timings()
+    if not timings:
+        return
+
+    logger.info("JSON codec (%s) timings by call site:", BACKEND)
+    for site, stats in sorted(
+        timings.items(), key=lambda t: t[1]["seconds"], reverse=True
+    ):
+        logger.info(
+            "  %-24s %7d calls %9.3f ms",
+            site,
+            stats["calls"],
+            stats["seconds"] * 1000,
+        )
@@ -0,0 +1,99 @@
+"""Per-run record of the DynamoDB keys a test run has written.
+
+Every key written through DynamoDBHelper during a run with a TEST_RUN_ID is
+appended to a ledger file named after the environment, table and run, so the
+run can later delete what it created instead of resetting the whole table.
+Runs without an ID keep no ledger, so no shared ledger grows without bound.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from utils.dynamo_serialization import item_key_values
+
+logger = logging.getLogger(__name__)
+
+KEY_LEDGER_LOCATION = "data/dynamoDB/temp/ledgers/"
+
+_ledger_lock = threading.Lock()
+
+
+def current_run_id() -> str | None:
+    return os.getenv("TEST_RUN_ID") or None
+
+
+def key_ledger_enabled() -> bool:
+    """The ledger is kept for runs with a TEST_RUN_ID, unless KEY_LEDGER=false."""
+    return (
+        current_run_id() is not None
+        and os.getenv("KEY_LEDGER", "true").lower() != "false"
+    )
+
+
+def key_ledger_path(
+    environment, table_name, run_id: str, directory: str | Path = KEY_LEDGER_LOCATION
+) -> Path:
+    return Path(directory) / f"{environment}-{table_name}-{run_id}.jsonl"
+
+
+def other_run_keys(ledger_path: Path, environment, table_name) -> set[tuple]:
+    """Return the keys recorded by other runs' ledgers beside ``ledger_path``.
+
+    Only ledgers in this checkout can be seen; runs elsewhere are not.
+    """
+    return {
+        (key["NHS_NUMBER"], key["ATTRIBUTE_TYPE"])
+        for path in ledger_path.parent.glob(f"{environment}-{table_name}-*.jsonl")
+        if path != ledger_path
+        for key in read_keys(path)
+    }
+
+
+def record_keys(path: Path, items, serialized: bool = False) -> None:
+    """Append the (NHS_NUMBER, ATTRIBUTE_TYPE) key of each item to the ledger.
+
+    With ``serialized`` the items are in AttributeValue form.
+    """
+    lines = "".join(
+        json.dumps(list(item_key_values(item, serialized))) + "\n" for item in items
+    )
+    if not lines:
+        return
+
+    try:
+        with _ledger_lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as f:
+                f.write(lines)
+    except OSError as e:
+        logger.warning("Failed to record keys in %s: %s", path, e)
+
+
+def read_keys(path: Path) -> list[dict]:
+    """Return the distinct keys recorded in a ledger, in the order first written.
+
+    Lines that cannot be parsed, e.g. one cut short by a crash, are skipped.
+    """
+    keys = {}
+    skipped = 0
+    try:
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    nhs_number, attribute_type = json.loads(line)
+                except (json.JSONDecodeError, ValueError, TypeError):
+                    skipped += 1
+                    continue
+                keys.setdefault(
+                    (nhs_number, attribute_type),
+                    {"NHS_NUMBER": nhs_number, "ATTRIBUTE_TYPE": attribute_type},
+                )
+    except FileNotFoundError:
+        return []
+
+    if skipped:
+        logger.warning("Skipped %d unreadable lines in %s", skipped, path)
+    return list(keys.values())
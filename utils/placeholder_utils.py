@@ -10,35 +10,100 @@ logger = logging.getLogger(__name__)
 
 FAILED_PLACEHOLDER_MSG = "Failed to resolve placeholder: %s"
 
+LONDON_TZ = ZoneInfo("Europe/London")
+PLACEHOLDER_PATTERN = re.compile(r"<<(.*?)>>")
+
+_PASSTHROUGH_PLACEHOLDERS = frozenset(
+    ["IGNORE_RESPONSE_ID", "IGNORE_DATE", "RANDOM_GUID", "IGNORE_ID"]
+)
+
+_TIME_HANDLERS = {
+    "HOUR": lambda n, s: n + timedelta(hours=int(s)),
+    "MINUTE": lambda n, s: n + timedelta(minutes=int(s)),
+    "SECOND": lambda n, s: n + timedelta(seconds=int(s)),
+}
+
+_DATE_HANDLERS = {
+    "DAY": lambda n, s: n + timedelta(days=int(s)),
+    "WEEK": lambda n, s: n + timedelta(weeks=int(s)),
+    "MONTH": lambda n, s: n + relativedelta(months=int(s)),
+    "YEAR": lambda n, s: n + relativedelta(years=int(s)),
+}
+
+_DATE_FORMATS = {
+    "RDATE": "%-d %B %Y",
+    "NBSDATE": "%Y-%m-%d",
+    "DATE": "%Y%m%d",
+}
+
+
+class PlaceholderResolver:
+    """Resolves <<PLACEHOLDER>> tokens against a single clock snapshot.
+
+    Date tokens are resolved against ``now`` and memoized, so every file in a
+    run sees the same dates even if the run crosses midnight. TIME tokens are
+    deliberately resolved against the live clock and never memoized: configs
+    use them for iteration start times only minutes either side of the moment
+    they are uploaded.
+    """
+
+    def __init__(self, now: datetime | None = None) -> None:
+        self.now = now or datetime.now(LONDON_TZ)
+        self._resolved: dict[str, str] = {}
+
+    def resolve(self, value, file_name):
+        if not isinstance(value, str) or "<<" not in value:
+            return value
+
+        def replacer(match):
+            placeholder = match.group(1)
+            try:
+                resolved = self.resolve_token(placeholder)
+            except Exception:
+                logger.exception(
+                    "[ERROR] Could not resolve placeholder %s: in %s:",
+                    placeholder,
+                    file_name,
+                )
+                return match.group(0)  # leave unchanged
+            return resolved
+
+        return PLACEHOLDER_PATTERN.sub(replacer, value)
+
+    def resolve_token(self, placeholder: str) -> str:
+        """Resolve a single token such as ``DATE_AGE_9-TOMORROW``."""
+        if placeholder.startswith("TIME_"):
+            return _resolve_placeholder_value(placeholder, datetime.now(LONDON_TZ))
+
+        resolved = self._resolved.get(placeholder)
+        if resolved is None:
+            resolved = _resolve_placeholder_value(placeholder, self.now)
+            self._resolved[placeholder] = resolved
+        return resolved
+
+
+_default_resolver: PlaceholderResolver | None = None
+
+
+def get_placeholder_resolver() -> PlaceholderResolver:
+    """Return the process-wide resolver, taking the clock snapshot on first use."""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = PlaceholderResolver()
+    return _default_resolver
+
 
 def resolve_placeholders(value, file_name):
     """
     Replace placeholders of the form <<PLACEHOLDER>> in a string with resolved values.
     If resolution fails, the original placeholder text is left unchanged.
     """
+    return get_placeholder_resolver().resolve(value, file_name)
 
-    if not isinstance(value, str):
-        return value
-
-    def replacer(match):
-        placeholder = match.group(1)
-        try:
-            resolved = _resolve_placeholder_value(placeholder)
-        except Exception:
-            logger.exception(
-                "[ERROR] Could not resolve placeholder %s: in %s:",
-                placeholder,
-                file_name,
-            )
-            return match.group(0)  # leave unchanged
-        return resolved
-
-    return re.sub(r"<<(.*?)>>", replacer, value)
 
+def _resolve_placeholder_value(placeholder: str, now: datetime) -> str:
 
-def _resolve_placeholder_value(placeholder: str) -> str:
-
-    if placeholder in ["IGNORE_RESPONSE_ID", "IGNORE_DATE", "RANDOM_GUID", "IGNORE_ID"]:
+    if placeholder in _PASSTHROUGH_PLACEHOLDERS:
         return placeholder
 
     parts = placeholder.split("_")
@@ -61,22 +126,14 @@ def _resolve_placeholder_value(placeholder: str) -> str:
         return f"<<{placeholder}>>"
 
     try:
-        return handler(placeholder_type, unit, shift)
+        return handler(now, placeholder_type, unit, shift)
     except Exception:
         logger.exception(FAILED_PLACEHOLDER_MSG, placeholder)
         return f"<<{placeholder}>>"
 
 
-def _resolve_time(_type: str, unit: str, shift: str) -> str:
-    now = datetime.now(ZoneInfo("Europe/London"))
-
-    handlers = {
-        "HOUR": lambda n, s: n + timedelta(hours=int(s)),
-        "MINUTE": lambda n, s: n + timedelta(minutes=int(s)),
-        "SECOND": lambda n, s: n + timedelta(seconds=int(s)),
-    }
-
-    fn = handlers.get(unit)
+def _resolve_time(now: datetime, _type: str, unit: str, shift: str) -> str:
+    fn = _TIME_HANDLERS.get(unit)
     if fn is None:
         return f"<<TIME_{unit}_{shift}>>"
 
@@ -84,27 +141,15 @@ def _resolve_time(_type: str, unit: str, shift: str) -> str:
     return new_time.strftime("%H:%M:%S")
 
 
-def _resolve_date(date_type: str, unit: str, shift: str) -> str:
-    now = datetime.now(ZoneInfo("Europe/London"))
-
-    handlers = {
-        "AGE": lambda n, s: _resolve_age_placeholder(n, s, date_type),
-        "DAY": lambda n, s: n + timedelta(days=int(s)),
-        "WEEK": lambda n, s: n + timedelta(weeks=int(s)),
-        "MONTH": lambda n, s: n + relativedelta(months=int(s)),
-        "YEAR": lambda n, s: n + relativedelta(years=int(s)),
-    }
+def _resolve_date(now: datetime, date_type: str, unit: str, shift: str) -> str:
+    if unit == "AGE":
+        return _resolve_age_placeholder(now, shift, date_type)
 
-    fn = handlers.get(unit)
+    fn = _DATE_HANDLERS.get(unit)
     if fn is None:
         return f"<<{date_type}_{unit}_{shift}>>"
 
-    result = fn(now, shift)
-
-    if isinstance(result, str):
-        return result  # AGE returns final formatted date
-
-    return _format_date(result, date_type)
+    return _format_date(fn(now, shift), date_type)
 
 
 def _resolve_age_placeholder(today: datetime, age_str: str, format_type: str) -> str:
@@ -136,11 +181,5 @@ def _resolve_age_placeholder(today: datetime, age_str: str, format_type: str) ->
 
 
 def _format_date(date: datetime, format_type: str) -> str:
-    formats = {
-        "RDATE": "%-d %B %Y",
-        "NBSDATE": "%Y-%m-%d",
-        "DATE": "%Y%m%d",
-    }
-
-    fmt = formats.get(format_type, "%Y%m%d")
+    fmt = _DATE_FORMATS.get(format_type, "%Y%m%d")
     return date.strftime(fmt)
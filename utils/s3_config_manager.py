@@ -2,25 +2,59 @@ import hashlib
 import json
 import logging
 import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
-import boto3
 import botocore.exceptions
 from dotenv import load_dotenv
 
+from utils import json_codec
+from utils.aws_clients import get_client, get_credentials
 from utils.data_helper import resolve_placeholders_in_data
+from utils.s3_config_sync import (
+    CONTENT_DIGEST_METADATA_KEY,
+    content_digest,
+    digest_metadata,
+    plan_config_sync,
+)
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-_cached_s3_config_manager: "S3ConfigManager | None" = None
+_HEAD_WORKERS = 16
+_DEFAULT_SYNC_WORKERS = 16
+# DeleteObjects accepts at most 1000 keys per call
+_DELETE_BATCH_SIZE = 1000
+
+_s3_config_managers: dict[str, "S3ConfigManager"] = {}
+_credentials_checked = False
+
+
+def _sync_workers() -> int:
+    return int(os.getenv("S3_SYNC_WORKERS", _DEFAULT_SYNC_WORKERS))
+
+
+def _check_credentials() -> None:
+    """Fail fast if AWS credentials are incomplete; checked once per process."""
+    global _credentials_checked
+    if _credentials_checked:
+        return
+    credentials = get_credentials()
+    assert credentials.access_key is not None, "aws_access_key_id not set"
+    assert credentials.secret_key is not None, "aws_secret_access_key not set"
+    assert credentials.token is not None, "aws_token not set"
+    _credentials_checked = True
 
 
 class S3ConfigManager:
     def __init__(self, bucket_name: str) -> None:
         self.bucket_name: str = bucket_name
-        self.s3_client = boto3.client("s3")
-        self._uploaded_configs: dict[str, str] = {}
+        self.s3_client = get_client("s3")
+        # Key -> content digest of what the bucket holds, or None for objects
+        # without one; read from S3 on first sync and kept up to date after
+        self._remote_digests: dict[str, str | None] | None = None
 
     def _s3_key(self, filename: str) -> str:
         return str(Path() / filename)
@@ -37,61 +71,78 @@ class S3ConfigManager:
         filename = Path(local_path).name
         s3_key = self._s3_key(filename)
 
-        try:
-            if self.config_exists_and_matches(local_path, s3_key):
-                logger.debug(
-                    "\n🔍 Config '%s' already exists and matches in S3. Skipping upload.",
-                    filename,
-                )
-                return
+        _check_credentials()
+        local_digest = self._calculate_file_hash(local_path)
+        metadata = self._head_metadata(s3_key)
+        if metadata is None:
+            logger.debug("🆕 No config found. Proceeding to upload.")
+        elif metadata.get(CONTENT_DIGEST_METADATA_KEY) == local_digest:
+            logger.debug(
+                "\n🔍 Config '%s' already exists and matches in S3. Skipping upload.",
+                filename,
+            )
+            return
+        else:
             logger.debug("🧹 A different config exists. Deleting all existing files...")
             self.delete_all()
-        except self.s3_client.exceptions.NoSuchKey:
-            logger.debug("🆕 No config found. Proceeding to upload.")
-        except botocore.exceptions.ClientError as error:
-            if error.response.get("Error", {}).get("Code") == "NoSuchKey":
-                logger.debug("🆕 No config found. Proceeding to upload.")
-            else:
-                raise
 
         logger.debug("⬆️ Uploading new config '%s' to S3...", filename)
-        self.s3_client.upload_file(local_path, self.bucket_name, s3_key)
+        self.s3_client.upload_file(
+            local_path,
+            self.bucket_name,
+            s3_key,
+            ExtraArgs={"Metadata": digest_metadata(local_digest)},
+        )
         logger.debug("📄 Uploaded to s3://%s/%s", self.bucket_name, s3_key)
+        if self._remote_digests is not None:
+            self._remote_digests[s3_key] = local_digest
 
     def config_exists_and_matches(self, local_path: Path, s3_key: str) -> bool:
-        session = boto3.Session()
-        credentials = session.get_credentials()
-        assert credentials.access_key is not None, "aws_access_key_id not set"
-        assert credentials.secret_key is not None, "aws_secret_access_key not set"
-        assert credentials.token is not None, "aws_token not set"
+        _check_credentials()
 
+        metadata = self._head_metadata(s3_key)
+        return metadata is not None and metadata.get(
+            CONTENT_DIGEST_METADATA_KEY
+        ) == self._calculate_file_hash(local_path)
+
+    def _head_metadata(self, s3_key: str) -> dict[str, str] | None:
+        """Return an object's user metadata, or None if there is no such object."""
         try:
-            s3_obj = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            s3_data = s3_obj["Body"].read()
-            s3_hash = hashlib.sha256(s3_data).hexdigest()
-            local_hash = self._calculate_file_hash(local_path)
-        except self.s3_client.exceptions.NoSuchKey:
-            return False
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)
         except botocore.exceptions.ClientError as error:
-            if error.response.get("Error", {}).get("Code") == "NoSuchKey":
-                return False
+            if error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return None
             raise
-        else:
-            return s3_hash == local_hash
+        return response.get("Metadata", {})
+
+    def _get_remote_digests(self) -> dict[str, str | None]:
+        """Return the content digest of every object in the bucket.
+
+        Read once with a listing and parallel HEAD requests, then maintained
+        as this manager uploads and deletes.
+        """
+        if self._remote_digests is None:
+            keys = self._list_existing_keys()
+            with ThreadPoolExecutor(max_workers=_HEAD_WORKERS) as executor:
+                metadata = list(executor.map(self._head_metadata, keys))
+            self._remote_digests = {
+                key: object_metadata.get(CONTENT_DIGEST_METADATA_KEY)
+                for key, object_metadata in zip(keys, metadata)
+                # Deleted since the listing
+                if object_metadata is not None
+            }
+        return self._remote_digests
 
     def delete_all(self) -> None:
-        """Delete all S3 objects"""
-        response = self.s3_client.list_objects_v2(Bucket=self.bucket_name)
+        """Delete all S3 objects, however many pages the bucket lists."""
+        keys = self._list_existing_keys(shard_by_prefix=True)
+        self._remote_digests = None
 
-        if "Contents" in response:
-            to_delete = [{"Key": obj["Key"]} for obj in response["Contents"]]
-            self.s3_client.delete_objects(
-                Bucket=self.bucket_name, Delete={"Objects": to_delete}
-            )
-            logger.debug("🗑️ Deleted %d file(s).", len(to_delete))
+        if keys:
+            self._delete_keys(keys)
+            logger.debug("🗑️ Deleted %d file(s).", len(keys))
         else:
             logger.warning("📭 Nothing to delete.")
-        self._uploaded_configs.clear()
 
     def _resolve_local_configs(self, local_paths: list[Path]) -> dict[str, str]:
         """Helper to read and resolve local JSON configs safely."""
@@ -103,8 +154,7 @@ class S3ConfigManager:
             logger.debug("🔧 Resolving placeholders in config: %s", filename)
 
             try:
-                with path.open() as f:
-                    raw_data = json.load(f)
+                raw_data = json_codec.load_file(path, site="config_load")
             except (OSError, IOError) as e:
                 logger.error("Failed to read config file %s: %s", path, e)
                 continue
@@ -113,88 +163,226 @@ class S3ConfigManager:
                 continue
 
             resolved = resolve_placeholders_in_data(raw_data, filename)
-            resolved_configs[s3_key] = json.dumps(resolved, indent=2)
+            resolved_configs[s3_key] = json_codec.dumps(
+                resolved, indent=True, site="config_dump"
+            )
 
         return resolved_configs
 
-    def _delete_stale_keys(self, desired_keys: set[str]) -> None:
-        """Helper to remove stale keys from S3 and local cache."""
-        if self._uploaded_configs:
-            stale_keys = [k for k in self._uploaded_configs if k not in desired_keys]
-        else:
-            existing_keys = self._list_existing_keys()
-            stale_keys = [k for k in existing_keys if k not in desired_keys]
-
-        if stale_keys:
-            self._delete_keys(stale_keys)
-            for k in stale_keys:
-                self._uploaded_configs.pop(k, None)
-
     def upload_all_configs(self, local_paths: list[Path]) -> None:
+        """Make the bucket hold exactly these configs, touching only what differs.
+
+        Configs whose content digest already matches the bucket's are skipped,
+        whichever process or run uploaded them.
+        """
         desired_filenames = [p.name for p in local_paths]
         desired_keys = {self._s3_key(name) for name in desired_filenames}
 
-        resolved_configs = self._resolve_local_configs(local_paths)
+        bodies = {
+            s3_key: resolved_json_str.encode("utf-8")
+            for s3_key, resolved_json_str in self._resolve_local_configs(
+                local_paths
+            ).items()
+        }
+        local_digests = {key: content_digest(body) for key, body in bodies.items()}
+        remote_digests = self._get_remote_digests()
+        to_upload, to_delete = plan_config_sync(
+            local_digests, remote_digests, desired_keys
+        )
 
-        if (
-            self._uploaded_configs
-            and set(self._uploaded_configs.keys()) == desired_keys
-            and all(
-                self._uploaded_configs.get(k) == resolved_configs.get(k)
-                for k in desired_keys
-            )
-        ):
-            logger.debug("⏭️ S3 configs unchanged since last upload. Skipping.")
+        if not to_upload and not to_delete:
+            logger.debug("⏭️ S3 configs unchanged. Skipping.")
             return
 
-        self._delete_stale_keys(desired_keys)
-
-        for s3_key, resolved_json_str in resolved_configs.items():
-            if self._uploaded_configs.get(s3_key) == resolved_json_str:
-                logger.debug("✅ Config '%s' unchanged. Skipping upload.", s3_key)
-            else:
-                logger.debug("⬆️ Uploading config '%s' to S3...", s3_key)
-                self.s3_client.put_object(
-                    Body=resolved_json_str.encode("utf-8"),
-                    Bucket=self.bucket_name,
-                    Key=s3_key,
-                    ContentType="application/json",
+        # Puts and deletes touch different keys, so all of them run at once
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=_sync_workers()) as executor:
+            delete_future = executor.submit(self._delete_keys, to_delete)
+            put_futures = {
+                s3_key: executor.submit(
+                    self._put_config, s3_key, bodies[s3_key], local_digests[s3_key]
                 )
-                logger.debug("📄 Uploaded to s3://%s/%s", self.bucket_name, s3_key)
-                self._uploaded_configs[s3_key] = resolved_json_str
+                for s3_key in to_upload
+            }
+        seconds = time.perf_counter() - start
 
-    def config_exists_and_matches_str(self, local_json_str: str, s3_key: str) -> bool:
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
-            remote_str = response["Body"].read().decode("utf-8")
-            return local_json_str.strip() == remote_str.strip()
-        except self.s3_client.exceptions.NoSuchKey:
-            return False
-
-    def _list_existing_keys(self) -> list[str]:
-        """List all object keys."""
-        response = self.s3_client.list_objects_v2(Bucket=self.bucket_name)
-        return [obj["Key"] for obj in response.get("Contents", [])]
-
-    def _delete_keys(self, keys: list[str]) -> None:
-        """Delete specific keys from the S3 bucket."""
-        self.s3_client.delete_objects(
+            delete_latencies = delete_future.result()
+            put_latencies = {
+                s3_key: future.result() for s3_key, future in put_futures.items()
+            }
+        except Exception:
+            # Some writes may have landed; read the bucket afresh next time
+            self._remote_digests = None
+            raise
+
+        for s3_key in to_delete:
+            remote_digests.pop(s3_key, None)
+        for s3_key in to_upload:
+            remote_digests[s3_key] = local_digests[s3_key]
+        self._log_sync_latency(seconds, put_latencies, delete_latencies)
+
+    def _put_config(self, s3_key: str, body: bytes, digest: str) -> float:
+        """Upload one config, returning the seconds the request took."""
+        logger.debug("⬆️ Uploading config '%s' to S3...", s3_key)
+        start = time.perf_counter()
+        self.s3_client.put_object(
+            Body=body,
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            ContentType="application/json",
+            Metadata=digest_metadata(digest),
+        )
+        latency = time.perf_counter() - start
+        logger.debug(
+            "📄 Uploaded to s3://%s/%s in %.0f ms",
+            self.bucket_name,
+            s3_key,
+            latency * 1000,
+        )
+        return latency
+
+    def _log_sync_latency(
+        self,
+        seconds: float,
+        put_latencies: dict[str, float],
+        delete_latencies: list[float],
+    ) -> None:
+        summary = [
+            f"Synced s3://{self.bucket_name} in {seconds * 1000:.0f} ms",
+            f"{len(put_latencies)} uploaded",
+        ]
+        if put_latencies:
+            slowest = max(put_latencies, key=put_latencies.get)
+            summary.append(
+                f"put p50 {statistics.median(put_latencies.values()) * 1000:.0f} ms, "
+                f"max {put_latencies[slowest] * 1000:.0f} ms ({slowest})"
+            )
+        if delete_latencies:
+            summary.append(
+                f"{len(delete_latencies)} delete batch(es), "
+                f"max {max(delete_latencies) * 1000:.0f} ms"
+            )
+        logger.info("; ".join(summary))
+
+    def config_exists_and_matches_str(self, local_json_str: str, s3_key: str) -> bool:
+        metadata = self._head_metadata(s3_key)
+        return metadata is not None and metadata.get(
+            CONTENT_DIGEST_METADATA_KEY
+        ) == content_digest(local_json_str.encode("utf-8"))
+
+    def _list_existing_keys(self, shard_by_prefix: bool = False) -> list[str]:
+        """List all object keys, following every page of the listing.
+
+        With ``shard_by_prefix``, the keys under each top-level "folder" are
+        listed on their own thread; a flat bucket is listed as usual.
+        """
+        if not shard_by_prefix:
+            return self._list_prefix("")
+
+        keys: list[str] = []
+        prefixes: list[str] = []
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Delimiter="/"):
+            keys.extend(obj["Key"] for obj in page.get("Contents", []))
+            prefixes.extend(
+                prefix["Prefix"] for prefix in page.get("CommonPrefixes", [])
+            )
+
+        if prefixes:
+            with ThreadPoolExecutor(max_workers=_sync_workers()) as executor:
+                for prefix_keys in executor.map(self._list_prefix, prefixes):
+                    keys.extend(prefix_keys)
+        return keys
+
+    def _list_prefix(self, prefix: str) -> list[str]:
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        return [
+            obj["Key"]
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+            for obj in page.get("Contents", [])
+        ]
+
+    def _delete_keys(self, keys: list[str]) -> list[float]:
+        """Delete keys in parallel batches of 1000, returning each batch's seconds.
+
+        Every batch is attempted and awaited even if others fail.
+
+        Raises:
+            RuntimeError: If any batch request failed or S3 reports that any key
+                could not be deleted, listing the failures from all batches.
+        """
+        batches = [
+            keys[i : i + _DELETE_BATCH_SIZE]
+            for i in range(0, len(keys), _DELETE_BATCH_SIZE)
+        ]
+        if not batches:
+            return []
+        latencies = []
+        errors = []
+        batch_failures = []
+        with ThreadPoolExecutor(
+            max_workers=min(_sync_workers(), len(batches))
+        ) as executor:
+            futures = {
+                executor.submit(self._delete_batch, batch): batch for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                exception = future.exception()
+                if exception is not None:
+                    batch_failures.append((batch, exception))
+                    continue
+                latency, batch_errors = future.result()
+                latencies.append(latency)
+                errors.extend(batch_errors)
+
+        if errors or batch_failures:
+            failed = len(errors) + sum(len(batch) for batch, _ in batch_failures)
+            reasons = [
+                f"batch of {len(batch)} from {batch[0]} ({exception})"
+                for batch, exception in batch_failures
+            ] + [f"{error.get('Key')} ({error.get('Code')})" for error in errors[:10]]
+            raise RuntimeError(
+                f"Failed to delete {failed} of {len(keys)} file(s) from "
+                f"{self.bucket_name}: " + ", ".join(reasons)
+            ) from (batch_failures[0][1] if batch_failures else None)
+        return latencies
+
+    def _delete_batch(self, keys: list[str]) -> tuple[float, list[dict]]:
+        """Delete up to 1000 keys, returning the seconds taken and any per-key errors."""
+        start = time.perf_counter()
+        response = self.s3_client.delete_objects(
             Bucket=self.bucket_name,
-            Delete={"Objects": [{"Key": key} for key in keys]},
+            Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
         )
-        logger.debug("🗑️ Deleted %d obsolete file(s): %s", len(keys), keys)
+        latency = time.perf_counter() - start
+        errors = response.get("Errors", [])
+        logger.debug(
+            "🗑️ Deleted %d file(s) in %.0f ms: %s",
+            len(keys) - len(errors),
+            latency * 1000,
+            keys,
+        )
+        return latency, errors
+
+
+def get_s3_config_manager(bucket_name: str) -> S3ConfigManager:
+    """Return the manager for a bucket, reusing it so its view of the bucket persists."""
+    manager = _s3_config_managers.get(bucket_name)
+    if manager is None:
+        manager = _s3_config_managers[bucket_name] = S3ConfigManager(bucket_name)
+    return manager
 
 
 def upload_config_to_s3(local_path: Path) -> None:
-    s3_connection = S3ConfigManager(os.getenv("S3_CONFIG_BUCKET_NAME"))
+    s3_connection = get_s3_config_manager(os.getenv("S3_CONFIG_BUCKET_NAME"))
     s3_connection.upload_if_missing_or_changed(local_path)
 
 
 def upload_configs_to_s3(
     config_files: list[str], config_path: str | Path | None = None
 ) -> None:
-    global _cached_s3_config_manager
-
     if config_path:
         base = Path(config_path)
         # Treat entries as filenames relative to the base path
@@ -203,22 +391,14 @@ def upload_configs_to_s3(
         # Treat entries as fully-qualified paths
         local_paths = [Path(p) for p in config_files]
 
-    bucket = os.getenv("S3_CONFIG_BUCKET_NAME")
-    if (
-        _cached_s3_config_manager is None
-        or _cached_s3_config_manager.bucket_name != bucket
-    ):
-        _cached_s3_config_manager = S3ConfigManager(bucket)
-
-    _cached_s3_config_manager.upload_all_configs(local_paths)
+    s3_connection = get_s3_config_manager(os.getenv("S3_CONFIG_BUCKET_NAME"))
+    s3_connection.upload_all_configs(local_paths)
 
 
 def delete_all_configs_from_s3() -> None:
-    s3_connection = S3ConfigManager(os.getenv("S3_CONFIG_BUCKET_NAME"))
+    # delete_all also resets the shared manager's view of the bucket
+    s3_connection = get_s3_config_manager(os.getenv("S3_CONFIG_BUCKET_NAME"))
     s3_connection.delete_all()
-    # Also invalidate the cached manager so it doesn't think configs still exist
-    if _cached_s3_config_manager is not None:
-        _cached_s3_config_manager._uploaded_configs.clear()
 
 
 def upload_consumer_mapping_file_to_s3(local_path: str) -> None:
@@ -228,5 +408,5 @@ def upload_consumer_mapping_file_to_s3(local_path: str) -> None:
         local_path,
         s3_bucket,
     )
-    s3_connection = S3ConfigManager(s3_bucket)
+    s3_connection = get_s3_config_manager(s3_bucket)
     s3_connection.upload_if_missing_or_changed(Path(local_path))
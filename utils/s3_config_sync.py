@@ -0,0 +1,40 @@
+"""Content digests for deciding which S3 configs need uploading or deleting.
+
+Every config is uploaded with the SHA-256 of its body in its object
+metadata, so whether the bucket already holds a config can be answered from
+a HEAD request, without downloading the body, by any process or run.
+"""
+
+import hashlib
+
+# Stored as the x-amz-meta-content-sha256 header; S3 lowercases metadata keys
+CONTENT_DIGEST_METADATA_KEY = "content-sha256"
+
+
+def content_digest(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()
+
+
+def digest_metadata(digest: str) -> dict[str, str]:
+    return {CONTENT_DIGEST_METADATA_KEY: digest}
+
+
+def plan_config_sync(
+    local_digests: dict[str, str],
+    remote_digests: dict[str, str | None],
+    desired_keys: set[str],
+) -> tuple[list[str], list[str]]:
+    """Return the keys to upload and the keys to delete.
+
+    A config is uploaded when the bucket does not hold it with the same
+    digest; objects uploaded before digests were recorded have a digest of
+    None and so are always replaced. Remote keys that are not desired are
+    deleted.
+    """
+    to_upload = [
+        key
+        for key, digest in local_digests.items()
+        if remote_digests.get(key) != digest
+    ]
+    to_delete = [key for key in remote_digests if key not in desired_keys]
+    return to_upload, to_delete
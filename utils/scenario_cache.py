@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from . import json_codec
+from .data_template_resolver import DEFAULT_TEMPLATE
+from .placeholder_utils import get_placeholder_resolver
+
+logger = logging.getLogger(__name__)
+
+SCENARIO_CACHE_LOCATION = "data/dynamoDB/temp/scenario_cache/"
+
+# Bump when the layout of cached entries changes
+_CACHE_FORMAT_VERSION = 3
+
+# Source files whose behaviour is baked into a cached entry. Editing any of
+# them invalidates every cached scenario.
+_PIPELINE_SOURCES = (
+    "data_helper.py",
+    "data_template_resolver.py",
+    "document_transformer.py",
+    "dynamo_serialization.py",
+    "json_codec.py",
+    "placeholder_utils.py",
+)
+
+# TIME placeholders change within a day, so files using them are never cached
+_TIME_SENSITIVE_MARKER = b"<<TIME_"
+
+
+def _sha256_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _pipeline_digest() -> str:
+    sha256 = hashlib.sha256()
+    utils_dir = Path(__file__).resolve().parent
+    for name in _PIPELINE_SOURCES:
+        sha256.update((utils_dir / name).read_bytes())
+    return sha256.hexdigest()
+
+
+def scenario_cache_enabled() -> bool:
+    """The cache is on unless SCENARIO_CACHE is set to false."""
+    return os.getenv("SCENARIO_CACHE", "true").lower() != "false"
+
+
+class ScenarioCache:
+    """On-disk cache of fully resolved scenario entries.
+
+    An entry is keyed on the scenario file content, the Dynamo template file,
+    the templating code and the London date of the placeholder clock, so a
+    warm run on the same day can skip templating and placeholder resolution.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path = SCENARIO_CACHE_LOCATION,
+        template_path: str | Path = DEFAULT_TEMPLATE,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            self._static_digest = hashlib.sha256(
+                f"{_CACHE_FORMAT_VERSION}:{_sha256_file(Path(template_path))}:"
+                f"{_pipeline_digest()}".encode()
+            ).hexdigest()
+        except OSError as e:
+            logger.warning("Scenario cache disabled, cannot hash inputs: %s", e)
+            self._static_digest = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._static_digest is not None
+
+    def cache_key(self, raw_bytes: bytes, cached_test: bool) -> str | None:
+        """Return the cache key for a scenario file, or None if it must not be cached."""
+        if not self.enabled or _TIME_SENSITIVE_MARKER in raw_bytes:
+            return None
+
+        run_date = get_placeholder_resolver().now.date().isoformat()
+        sha256 = hashlib.sha256()
+        sha256.update(raw_bytes)
+        sha256.update(f":{self._static_digest}:{run_date}:{cached_test}".encode())
+        return sha256.hexdigest()
+
+    def _entry_path(self, path: Path) -> Path:
+        return self.cache_dir / path.parent.name / path.name
+
+    def get(self, path: Path, key: str | None) -> dict | None:
+        """Return the cached entry for ``path`` if it was stored under ``key``."""
+        entry = None
+        if key is not None:
+            try:
+                cached = json_codec.load_file(
+                    self._entry_path(path), site="scenario_cache_read"
+                )
+                if cached.get("key") == key:
+                    entry = cached.get("entry")
+            except (OSError, json.JSONDecodeError):
+                entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def put(self, path: Path, key: str | None, entry: dict) -> None:
+        if key is None:
+            return
+
+        entry_path = self._entry_path(path)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_suffix(".tmp")
+            tmp_path.write_text(
+                json_codec.dumps(
+                    {"key": key, "entry": entry}, site="scenario_cache_write"
+                ),
+                encoding="utf-8",
+            )
+            tmp_path.replace(entry_path)
+        except OSError as e:
+            logger.warning("Failed to write scenario cache for %s: %s", path, e)
@@ -0,0 +1,126 @@
+import fnmatch
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SCENARIO_MANIFEST_LOCATION = "data/dynamoDB/temp/manifests/"
+
+# Bump when the fields recorded per scenario change
+_MANIFEST_VERSION = 1
+
+
+def _manifest_path(folder: Path, manifest_dir: Path) -> Path:
+    return manifest_dir / f"{folder.name}.json"
+
+
+def _read_manifest(manifest_path: Path) -> dict[str, dict]:
+    try:
+        with manifest_path.open(encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if manifest.get("version") != _MANIFEST_VERSION:
+        return {}
+    return manifest.get("scenarios", {})
+
+
+def _write_manifest(manifest_path: Path, scenarios: dict[str, dict]) -> None:
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = manifest_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump({"version": _MANIFEST_VERSION, "scenarios": scenarios}, f)
+        tmp_path.replace(manifest_path)
+    except OSError as e:
+        logger.warning("Failed to write scenario manifest %s: %s", manifest_path, e)
+
+
+def _summarise_scenario(path: Path, mtime_ns: int, size: int) -> dict:
+    """Build the manifest entry for one scenario file."""
+    entry = {"mtime_ns": mtime_ns, "size": size}
+    try:
+        raw_bytes = path.read_bytes()
+        raw_json = json.loads(raw_bytes)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("Scenario %s left out of the manifest: %s", path, e)
+        entry["invalid"] = True
+        return entry
+
+    nhs_numbers = {
+        str(item["NHS_NUMBER"])
+        for item in raw_json.get("data") or []
+        if isinstance(item, dict) and item.get("NHS_NUMBER")
+    }
+    entry.update(
+        {
+            "digest": hashlib.sha256(raw_bytes).hexdigest(),
+            "scenario_name": raw_json.get("scenario_name"),
+            "nhs_numbers": sorted(nhs_numbers),
+            "config_filenames": raw_json.get("config_filenames"),
+            "expected_response_code": raw_json.get("expected_response_code"),
+        }
+    )
+    return entry
+
+
+def load_scenario_manifest(
+    folder_path, manifest_dir: str | Path = SCENARIO_MANIFEST_LOCATION
+) -> dict[str, dict]:
+    """Return the manifest index for a scenario folder, refreshing it as needed.
+
+    The index maps each filename to its scenario name, NHS numbers, config
+    filenames, expected status code and content digest. Only files whose
+    modification time or size changed since the last build are re-parsed.
+    Files that are not valid JSON are tracked but flagged ``invalid``.
+    """
+    folder = Path(folder_path)
+    manifest_path = _manifest_path(folder, Path(manifest_dir))
+    previous = _read_manifest(manifest_path)
+
+    scenarios = {}
+    refreshed = 0
+    for path in sorted(folder.glob("*.json"), key=lambda p: p.name.lower()):
+        stat = path.stat()
+        entry = previous.get(path.name)
+        if (
+            entry is None
+            or entry.get("mtime_ns") != stat.st_mtime_ns
+            or entry.get("size") != stat.st_size
+        ):
+            entry = _summarise_scenario(path, stat.st_mtime_ns, stat.st_size)
+            refreshed += 1
+        scenarios[path.name] = entry
+
+    if refreshed or scenarios.keys() != previous.keys():
+        _write_manifest(manifest_path, scenarios)
+    logger.debug(
+        "Scenario manifest for %s: %d files, %d refreshed",
+        folder.name,
+        len(scenarios),
+        refreshed,
+    )
+    return scenarios
+
+
+def _matches(selector: str, filename: str, entry: dict) -> bool:
+    if fnmatch.fnmatch(filename, selector) or selector in entry["nhs_numbers"]:
+        return True
+    scenario_name = entry.get("scenario_name") or ""
+    return selector.lower() in scenario_name.lower()
+
+
+def select_scenario_files(manifest: dict[str, dict], selectors: list[str]) -> list[str]:
+    """Return the filenames in ``manifest`` matching any of ``selectors``.
+
+    A selector matches a filename or filename glob, one of the scenario's
+    NHS numbers, or a case-insensitive substring of its scenario name.
+    """
+    return [
+        filename
+        for filename, entry in manifest.items()
+        if not entry.get("invalid")
+        and any(_matches(selector, filename, entry) for selector in selectors)
+    ]
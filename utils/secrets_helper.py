@@ -1,10 +1,11 @@
 import os
 
-import boto3
 from typing import Optional
 import logging
 from dotenv import load_dotenv
 
+from utils.aws_clients import get_client
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
@@ -13,7 +14,7 @@ class SecretsManagerClient:
 
     def __init__(self, region: str):
         self.region = region
-        self.client = boto3.client("secretsmanager", region_name=region)
+        self.client = get_client("secretsmanager", region_name=region)
 
     def _get_secret_key_versions(self, secret_name: str) -> dict[str, Optional[bytes]]:
 
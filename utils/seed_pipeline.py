@@ -0,0 +1,115 @@
+"""Streaming stages for writing scenario items to DynamoDB.
+
+Each stage is a generator, so items flow through one at a time and memory
+stays flat however many items a dataset produces. The final stage hands
+batches to a writer thread through a bounded queue, so writes overlap with
+loading, templating and hashing further up the pipeline.
+"""
+
+import hashlib
+import logging
+import queue
+import threading
+from typing import Callable, Iterable, Iterator
+
+from .dynamo_serialization import item_key_values
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 500
+# Batches that may wait for the writer before producers block
+_MAX_QUEUED_BATCHES = 4
+
+_END_OF_STREAM = object()
+
+
+def dynamo_key_digest(item: dict, serialized: bool = False) -> bytes:
+    """A 16 byte digest of an item's (NHS_NUMBER, ATTRIBUTE_TYPE) key.
+
+    Hashed NHS numbers are 128 hex characters, so remembering digests rather
+    than key tuples keeps the dedup set small for large datasets.
+    """
+    key = "\x1f".join(item_key_values(item, serialized))
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+def iter_unique_items(
+    items: Iterable[dict], serialized: bool = False
+) -> Iterator[dict]:
+    """Yield the first item seen for each (NHS_NUMBER, ATTRIBUTE_TYPE) key.
+
+    Some test scenarios share identical DynamoDB data (e.g. same patient,
+    different S3 configs) and batch_writer rejects duplicate keys in a batch.
+    """
+    seen_keys = set()
+    total = 0
+    for item in items:
+        total += 1
+        key = dynamo_key_digest(item, serialized)
+        if key not in seen_keys:
+            seen_keys.add(key)
+            yield item
+
+    if len(seen_keys) < total:
+        logger.info(
+            "Deduplicated %d → %d items (removed %d duplicates)",
+            total,
+            len(seen_keys),
+            total - len(seen_keys),
+        )
+
+
+def iter_batches(items: Iterable[dict], size: int = WRITE_BATCH_SIZE) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_batches_in_background(
+    batches: Iterable[list],
+    write: Callable[[list], None],
+    max_queued: int = _MAX_QUEUED_BATCHES,
+) -> int:
+    """Write batches on a separate thread while ``batches`` is still producing.
+
+    At most ``max_queued`` batches are held between the two sides. If a write
+    fails, production stops and the error is re-raised here.
+
+    Returns:
+        The number of items written.
+    """
+    pending = queue.Queue(maxsize=max_queued)
+    errors: list[BaseException] = []
+    written = 0
+
+    def writer():
+        nonlocal written
+        while (batch := pending.get()) is not _END_OF_STREAM:
+            # After a failure keep draining, so the producer never blocks
+            if errors:
+                continue
+            try:
+                write(batch)
+                written += len(batch)
+            except BaseException as e:  # re-raised on the calling thread
+                errors.append(e)
+
+    writer_thread = threading.Thread(target=writer, name="dynamo-seed-writer")
+    writer_thread.start()
+    try:
+        for batch in batches:
+            if errors:
+                break
+            pending.put(batch)
+    finally:
+        pending.put(_END_OF_STREAM)
+        writer_thread.join()
+
+    if errors:
+        raise errors[0]
+    return written